@@ -1,11 +1,18 @@
 """Coding agent module using Claude Agent SDK."""
 
-from agent.fix_agent import run_fix_agent, run_feedback_fix_agent, FixResult
+from agent.fix_agent import (
+    run_fix_agent,
+    run_feedback_fix_agent,
+    prewarm_fix_agent,
+    release_agent_sessions,
+    FixResult,
+)
 from agent.repo import (
     clone_repo,
+    clone_repo_async,
     create_branch,
     checkout_branch,
-    commit_and_push,
+    commit_and_push_async,
     create_pr,
     cleanup_repo,
 )
@@ -13,11 +20,14 @@ from agent.repo import (
 __all__ = [
     "run_fix_agent",
     "run_feedback_fix_agent",
+    "prewarm_fix_agent",
+    "release_agent_sessions",
     "FixResult",
     "clone_repo",
+    "clone_repo_async",
     "create_branch",
     "checkout_branch",
-    "commit_and_push",
+    "commit_and_push_async",
     "create_pr",
     "cleanup_repo",
 ]
@@ -1,18 +1,53 @@
 """Coding fix agent using Claude Agent SDK."""
 
+import asyncio
+import contextvars
+import functools
 import logging
 import os
+import re
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
 from pathlib import Path
 
-import weave
-from claude_agent_sdk import query, ClaudeAgentOptions
+from claude_agent_sdk import (
+    AssistantMessage,
+    ClaudeAgentOptions,
+    ClaudeSDKClient,
+    ResultMessage,
+    ToolUseBlock,
+)
+from claude_agent_sdk.types import Message
 
 logger = logging.getLogger(__name__)
 
 # Track whether Weave has been initialized
 _weave_initialized = False
 
+# The weave module, imported by init_weave() (it pulls in a large dependency tree)
+_weave = None
+
+# Weave ops created on first traced call, keyed by the undecorated function
+_weave_ops: dict[Callable, Callable] = {}
+
+# Tools the agent is allowed to use
+ALLOWED_TOOLS = ["Read", "Edit", "Glob", "Grep", "Bash"]
+
+# Maximum number of Claude CLI subprocesses kept alive by the agent pool
+AGENT_POOL_MAX_CLIENTS = int(os.getenv("AGENT_POOL_MAX_CLIENTS", "4"))
+
+# Maximum number of tool calls waiting to be traced before new ones are dropped
+TOOL_TRACE_QUEUE_SIZE = 1024
+
+# String tool inputs (e.g. Edit old_string/new_string) are truncated to this length
+TOOL_TRACE_MAX_FIELD_LENGTH = 2048
+
+# Background queue feeding tool calls to Weave (created on first use)
+_tool_trace_queue: asyncio.Queue | None = None
+_tool_trace_task: asyncio.Task | None = None
+
 
 def init_weave() -> bool:
     """Initialize Weave if WANDB_API_KEY is set.
@@ -23,14 +58,17 @@ def init_weave() -> bool:
     Returns:
         True if Weave was initialized, False otherwise.
     """
-    global _weave_initialized
+    global _weave, _weave_initialized
     if _weave_initialized:
         return True
     
     if os.getenv("WANDB_API_KEY"):
         project_name = os.getenv("WEAVE_PROJECT", "darwin-agent")
         try:
+            import weave
+
             weave.init(project_name)
+            _weave = weave
             _weave_initialized = True
             logger.info("Weave initialized for project: %s", project_name)
             return True
@@ -42,35 +80,75 @@ def init_weave() -> bool:
         return False
 
 
-@weave.op()
-def log_tool_call(tool_name: str, tool_input: dict) -> dict:
-    """Log a tool call as a Weave child span.
-    
-    This creates a nested span in the Weave trace for each tool the agent uses.
-    
+def _weave_op(func: Callable) -> Callable:
+    """Get the Weave op wrapping func, creating it on first use."""
+    op = _weave_ops.get(func)
+    if op is None:
+        op = _weave_ops[func] = _weave.op()(func)
+    return op
+
+
+def _traced(func: Callable) -> Callable:
+    """Trace func as a Weave op once Weave is initialized.
+
+    Stands in for @weave.op() so weave is only imported when tracing is
+    enabled. Until init_weave() succeeds, calls go straight to func.
+
     Args:
-        tool_name: Name of the tool (Read, Edit, Glob, Grep, Bash, etc.)
-        tool_input: Input parameters passed to the tool.
-        
+        func: The function (sync or async) to trace.
+
     Returns:
-        A dict summarizing the tool call for the trace.
+        The wrapped function.
     """
-    # Create a concise summary based on tool type
-    summary = ""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not _weave_initialized:
+                return await func(*args, **kwargs)
+            return await _weave_op(func)(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _weave_initialized:
+            return func(*args, **kwargs)
+        return _weave_op(func)(*args, **kwargs)
+
+    return wrapper
+
+
+def _summarize_tool_call(tool_name: str, tool_input: dict) -> str:
+    """Create a concise, human-readable summary of a tool call."""
     if tool_name == "Read":
-        summary = tool_input.get("file_path", "unknown file")
+        return tool_input.get("file_path", "unknown file")
     elif tool_name == "Edit":
-        summary = tool_input.get("file_path", "unknown file")
+        return tool_input.get("file_path", "unknown file")
     elif tool_name == "Glob":
-        summary = tool_input.get("pattern", "unknown pattern")
+        return tool_input.get("pattern", "unknown pattern")
     elif tool_name == "Grep":
-        summary = tool_input.get("pattern", "unknown pattern")
+        return tool_input.get("pattern", "unknown pattern")
     elif tool_name == "Bash":
         cmd = tool_input.get("command", "")
-        summary = cmd[:100] + "..." if len(cmd) > 100 else cmd
+        return cmd[:100] + "..." if len(cmd) > 100 else cmd
     else:
-        summary = str(tool_input)[:100]
+        return str(tool_input)[:100]
+
+
+@_traced
+def trace_tool_call(tool_name: str, tool_input: dict) -> dict:
+    """Log a tool call as a Weave child span.
     
+    This creates a nested span in the Weave trace for each tool the agent uses.
+    
+    Args:
+        tool_name: Name of the tool (Read, Edit, Glob, Grep, Bash, etc.)
+        tool_input: Input parameters passed to the tool.
+        
+    Returns:
+        A dict summarizing the tool call for the trace.
+    """
+    summary = _summarize_tool_call(tool_name, tool_input)
     logger.info("[Agent] %s: %s", tool_name, summary)
     
     return {
@@ -79,26 +157,232 @@ def log_tool_call(tool_name: str, tool_input: dict) -> dict:
         "input": tool_input,
     }
 
-# Prompt template for the fix agent
-FIX_AGENT_PROMPT = """You are a skilled software engineer fixing a bug or implementing a feature.
 
-## Task Information
-- **Category**: {category}
-- **Title**: {title}
-- **Summary**: {summary}
-- **Suggested Action**: {suggested_action}
+def _truncate_tool_input(tool_input: dict) -> dict:
+    """Truncate long string values so large edits don't bloat the trace."""
+    return {
+        key: value[:TOOL_TRACE_MAX_FIELD_LENGTH] + "..."
+        if isinstance(value, str) and len(value) > TOOL_TRACE_MAX_FIELD_LENGTH
+        else value
+        for key, value in tool_input.items()
+    }
 
-## Coding Style Rules for {product}
-These rules were learned from past code reviews. Follow them when making changes:
 
-{style_rules}
+async def _drain_tool_trace_queue(queue: asyncio.Queue) -> None:
+    """Trace queued tool calls in the background."""
+    while True:
+        context, tool_name, tool_input = await queue.get()
+        try:
+            # Run in the caller's context so the span nests under its agent run
+            context.run(trace_tool_call, tool_name, tool_input)
+        except Exception as e:
+            logger.debug("Failed to trace tool call %s: %s", tool_name, e)
+        finally:
+            queue.task_done()
+
+
+def log_tool_call(tool_name: str, tool_input: dict) -> None:
+    """Queue a tool call to be traced off the agent's critical path.
+
+    Tracing happens in a background task so the agent's message stream isn't
+    held up by Weave serialization. Calls are dropped if the queue is full.
+    When Weave is disabled the call is only logged.
+
+    Args:
+        tool_name: Name of the tool (Read, Edit, Glob, Grep, Bash, etc.)
+        tool_input: Input parameters passed to the tool.
+    """
+    global _tool_trace_queue, _tool_trace_task
+    if not _weave_initialized:
+        # No tracing: just log, skipping the op wrapper and trace payload
+        logger.info("[Agent] %s: %s", tool_name, _summarize_tool_call(tool_name, tool_input))
+        return
+
+    if _tool_trace_task is None or _tool_trace_task.done():
+        _tool_trace_queue = asyncio.Queue(maxsize=TOOL_TRACE_QUEUE_SIZE)
+        _tool_trace_task = asyncio.create_task(_drain_tool_trace_queue(_tool_trace_queue))
+
+    try:
+        _tool_trace_queue.put_nowait(
+            (contextvars.copy_context(), tool_name, _truncate_tool_input(tool_input))
+        )
+    except asyncio.QueueFull:
+        logger.warning("Tool trace queue full, dropping %s call", tool_name)
+
+
+class ClaudeAgentPool:
+    """Pool of long-lived Claude CLI sessions.
+
+    Spawning the ``claude`` CLI costs several seconds before the first token,
+    so each distinct (cwd, system prompt) pair keeps one connected
+    ClaudeSDKClient in streaming input mode, which can be spawned ahead of
+    time (warm) and reused by later submissions for the same clone.
+    Submissions for the same key are serialized since the CLI session is
+    bound to a single working directory and runs one turn at a time.
+
+    A session's cwd is the task's temporary clone, so call release() before
+    the clone is deleted; a session must not outlive its directory or carry
+    its conversation over to a re-clone at the same path.
+    """
+
+    def __init__(self, max_clients: int = AGENT_POOL_MAX_CLIENTS):
+        """Initialize the pool.
+
+        Args:
+            max_clients: Maximum number of clients to keep connected. The least
+                recently used idle client is disconnected beyond this limit.
+        """
+        self._max_clients = max_clients
+        self._clients: OrderedDict[tuple[str, str], ClaudeSDKClient] = OrderedDict()
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    async def submit(
+        self,
+        repo_path: Path,
+        system_prompt: str,
+        prompt: str,
+    ) -> AsyncIterator[Message]:
+        """Submit a prompt and stream the messages of that turn.
+
+        Args:
+            repo_path: Working directory for the agent.
+            system_prompt: System prompt for the session.
+            prompt: The task prompt.
+
+        Yields:
+            Messages from the agent, ending with the ResultMessage.
+        """
+        key = (str(repo_path), system_prompt)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            client = await self._get_client(key)
+            completed = False
+            try:
+                await client.query(prompt, session_id=uuid.uuid4().hex)
+                async for message in client.receive_response():
+                    yield message
+                completed = True
+            finally:
+                # A session abandoned mid-turn can't be reused safely
+                if not completed:
+                    await self._discard(key)
+
+    async def warm(self, repo_path: Path, system_prompt: str) -> None:
+        """Spawn the session for a key ahead of its first submission.
+
+        Args:
+            repo_path: Working directory for the agent.
+            system_prompt: System prompt for the session.
+        """
+        key = (str(repo_path), system_prompt)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            await self._get_client(key)
+
+    async def release(self, repo_path: Path) -> None:
+        """Disconnect and forget every session for a working directory.
+
+        Waits for a turn in progress on the directory to finish first.
+
+        Args:
+            repo_path: Working directory whose sessions should be closed.
+        """
+        cwd = str(repo_path)
+        for key in [key for key in {*self._clients, *self._locks} if key[0] == cwd]:
+            lock = self._locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                await self._discard(key)
+            if self._locks.get(key) is lock and not lock.locked():
+                del self._locks[key]
+
+    async def _get_client(self, key: tuple[str, str]) -> ClaudeSDKClient:
+        """Get the connected client for a key, spawning one if needed."""
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            return client
+
+        cwd, system_prompt = key
+        logger.info("Starting Claude agent session for %s", cwd)
+        client = ClaudeSDKClient(
+            options=ClaudeAgentOptions(
+                cwd=cwd,
+                system_prompt=system_prompt,
+                allowed_tools=ALLOWED_TOOLS,
+                permission_mode="acceptEdits",  # Auto-accept file edits
+            )
+        )
+        await client.connect()
+        self._clients[key] = client
+
+        await self._evict_idle()
+        return client
+
+    async def _evict_idle(self) -> None:
+        """Disconnect least recently used idle clients beyond the pool limit."""
+        for key in list(self._clients):
+            if len(self._clients) <= self._max_clients:
+                break
+            lock = self._locks.get(key)
+            if lock is None or not lock.locked():
+                await self._discard(key)
+
+    async def _discard(self, key: tuple[str, str]) -> None:
+        """Disconnect and forget the client for a key."""
+        client = self._clients.pop(key, None)
+        lock = self._locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._locks[key]
+        if client is None:
+            return
+
+        try:
+            await client.interrupt()
+        except Exception as e:
+            logger.debug("Failed to interrupt agent session for %s: %s", key[0], e)
+        try:
+            await client.disconnect()
+        except Exception as e:
+            logger.warning("Failed to disconnect agent session for %s: %s", key[0], e)
+
+    async def close(self) -> None:
+        """Disconnect all clients."""
+        for key in list(self._clients):
+            await self._discard(key)
+
+
+# Shared agent pool (one per process)
+_agent_pool = ClaudeAgentPool()
+
+
+async def release_agent_sessions(repo_path: Path) -> None:
+    """Disconnect the pooled agent sessions for a repo before it is deleted.
+
+    Args:
+        repo_path: Path to the cloned repository.
+    """
+    await _agent_pool.release(repo_path)
+
+
+async def shutdown_agent_pool() -> None:
+    """Disconnect all pooled agent sessions and stop background tracing."""
+    await _agent_pool.close()
+    if _tool_trace_task is not None:
+        _tool_trace_task.cancel()
+    logger.info("Agent pool closed")
 
-## Similar Past Fixes (Learn from these!)
-{similar_fixes}
+
+# Static system prompt for the fix agent. Kept byte-identical across calls so
+# the shared prefix is served from Anthropic's prompt cache on every task.
+FIX_AGENT_SYSTEM_PROMPT = """You are a skilled software engineer fixing a bug or implementing a feature.
+
+Each task message gives you the coding style rules learned for the product,
+similar past fixes, and the task to work on.
 
 ## Instructions
 
-1. **Follow Style Rules**: Review the coding style rules above and apply them to your changes.
+1. **Follow Style Rules**: Review the coding style rules for the product and apply them to your changes.
 2. **Review Past Fixes**: Look at similar fixes for patterns and guidance.
 3. **Explore**: Understand the codebase structure. Use Glob and Grep to find relevant files.
 4. **Analyze**: Read the relevant files to understand the current implementation.
@@ -110,32 +394,37 @@ These rules were learned from past code reviews. Follow them when making changes
 
 - Make minimal, targeted changes
 - Follow the existing code style and conventions
-- Follow the style rules listed above - they come from real code reviews!
+- Follow the style rules for the product - they come from real code reviews!
 - Add comments if the fix is non-obvious
 - Do NOT run tests or commit - just make the file changes
 - If you're unsure about something, err on the side of making a smaller change
 - If similar fixes exist, consider following the same patterns
-
-Begin by exploring the codebase to find the relevant code for this issue.
 """
 
-# Prompt template for addressing PR review feedback
-FIX_FEEDBACK_PROMPT = """You are a skilled software engineer addressing code review feedback on a pull request.
+# Per-task prompt for the fix agent, ordered from most to least static:
+# per-product style rules first, then similar fixes, then the task itself.
+FIX_AGENT_PROMPT = """## Coding Style Rules for {product}
+These rules were learned from past code reviews. Follow them when making changes:
 
-## Original Task Information
+{style_rules}
+
+## Similar Past Fixes (Learn from these!)
+{similar_fixes}
+
+## Task Information
 - **Category**: {category}
 - **Title**: {title}
 - **Summary**: {summary}
+- **Suggested Action**: {suggested_action}
 
-## Review Feedback to Address
-
-A human reviewer has requested changes to your pull request. Here is their feedback:
+Begin by exploring the codebase to find the relevant code for this issue.
+"""
 
-### Review Comments
-{review_comments}
+# Static system prompt for addressing PR review feedback
+FIX_FEEDBACK_SYSTEM_PROMPT = """You are a skilled software engineer addressing code review feedback on a pull request.
 
-### Inline Code Comments
-{inline_comments}
+Each task message gives you the original task and the feedback a human
+reviewer left when requesting changes to your pull request.
 
 ## Instructions
 
@@ -151,10 +440,48 @@ A human reviewer has requested changes to your pull request. Here is their feedb
 - Follow the existing code style and conventions
 - If a comment is unclear, make your best effort to address it
 - Do NOT run tests or commit - just make the file changes
+"""
+
+# Per-task prompt for addressing PR review feedback
+FIX_FEEDBACK_PROMPT = """## Original Task Information
+- **Category**: {category}
+- **Title**: {title}
+- **Summary**: {summary}
+
+## Review Feedback to Address
+
+### Review Comments
+{review_comments}
+
+### Inline Code Comments
+{inline_comments}
 
 Begin by reading the files mentioned in the review comments.
 """
 
+# Matches "{name}" placeholders in the prompt templates
+_PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def _compile_prompt(template: str) -> list[str]:
+    """Split a prompt template once into alternating literal/placeholder segments.
+
+    Odd indices hold placeholder names, even indices hold literal text.
+    """
+    return _PLACEHOLDER_PATTERN.split(template)
+
+
+def _render_prompt(segments: list[str], **values: str) -> str:
+    """Render a template compiled with _compile_prompt."""
+    return "".join(
+        values[segment] if i % 2 else segment
+        for i, segment in enumerate(segments)
+    )
+
+
+_FIX_AGENT_PROMPT_SEGMENTS = _compile_prompt(FIX_AGENT_PROMPT)
+_FIX_FEEDBACK_PROMPT_SEGMENTS = _compile_prompt(FIX_FEEDBACK_PROMPT)
+
 
 @dataclass
 class FixResult:
@@ -166,7 +493,54 @@ class FixResult:
     error: str | None = None
 
 
-@weave.op()
+def _relative_to_repo(
+    file_path: str,
+    repo_prefixes: tuple[str, ...],
+    resolved_repo: Path,
+) -> str:
+    """Convert a path reported by the agent to one relative to the repo.
+
+    Checks the repo path (as given and resolved) as a string prefix first,
+    only falling back to resolve() for absolute paths that match neither.
+
+    Args:
+        file_path: Path from the tool input.
+        repo_prefixes: Repo path strings, each ending in os.sep.
+        resolved_repo: The resolved repo path.
+
+    Returns:
+        The relative path, or file_path unchanged if already relative or
+        outside the repo.
+    """
+    for prefix in repo_prefixes:
+        if file_path.startswith(prefix):
+            return file_path[len(prefix):]
+
+    if not os.path.isabs(file_path):
+        return file_path
+
+    try:
+        return str(Path(file_path).resolve().relative_to(resolved_repo))
+    except ValueError:
+        return file_path
+
+
+async def prewarm_fix_agent(repo_path: Path) -> None:
+    """Start the fix agent's CLI session for a repo ahead of run_fix_agent.
+
+    Lets the several-second CLI startup overlap with other pre-agent work.
+    Failures are logged; run_fix_agent will try to spawn the session again.
+
+    Args:
+        repo_path: Path to the cloned repository.
+    """
+    try:
+        await _agent_pool.warm(repo_path, FIX_AGENT_SYSTEM_PROMPT)
+    except Exception as e:
+        logger.warning("Failed to prewarm fix agent for %s: %s", repo_path, e)
+
+
+@_traced
 async def run_fix_agent(
     repo_path: Path,
     task: dict,
@@ -198,7 +572,8 @@ async def run_fix_agent(
     if not style_rules_text:
         style_rules_text = "No style rules learned yet for this product."
 
-    prompt = FIX_AGENT_PROMPT.format(
+    prompt = _render_prompt(
+        _FIX_AGENT_PROMPT_SEGMENTS,
         category=category,
         title=title,
         summary=summary,
@@ -212,56 +587,49 @@ async def run_fix_agent(
     logger.info("Working directory: %s", repo_path)
 
     files_changed: list[str] = []
+    seen_files: set[str] = set()
     last_result = ""
 
+    # Resolve once up front; resolve() handles the macOS /var -> /private/var symlink
+    resolved_repo = repo_path.resolve()
+    repo_prefixes = (str(repo_path) + os.sep, str(resolved_repo) + os.sep)
+
     try:
-        async for message in query(
-            prompt=prompt,
-            options=ClaudeAgentOptions(
-                cwd=str(repo_path),
-                allowed_tools=["Read", "Edit", "Glob", "Grep", "Bash"],
-                permission_mode="acceptEdits",  # Auto-accept file edits
-            ),
-        ):
+        async for message in _agent_pool.submit(repo_path, FIX_AGENT_SYSTEM_PROMPT, prompt):
             # Log the message class for debugging
-            msg_class = type(message).__name__
-            logger.debug("Agent message: %s", msg_class)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Agent message: %s", type(message).__name__)
+
+            # Capture final result from ResultMessage
+            if isinstance(message, ResultMessage):
+                last_result = message.result or ""
+                continue
 
             # Handle AssistantMessage with ToolUseBlock in content
             # Structure: AssistantMessage(content=[ToolUseBlock(name='Read', input={...})])
-            if hasattr(message, "content") and isinstance(message.content, list):
-                for block in message.content:
-                    # Check if this is a ToolUseBlock
-                    block_type = type(block).__name__
-                    if block_type == "ToolUseBlock":
-                        tool_name = getattr(block, "name", None)
-                        tool_input = getattr(block, "input", {}) or {}
-                        
-                        if tool_name:
-                            # Create a Weave child span for this tool call
-                            log_tool_call(tool_name, tool_input)
-                            
-                            # Track file changes from Edit tool
-                            if tool_name == "Edit":
-                                file_path = tool_input.get("file_path", "")
-                                if file_path:
-                                    # Convert to relative path if it starts with repo_path
-                                    # Use resolve() to handle macOS /var -> /private/var symlink
-                                    try:
-                                        resolved_file = Path(file_path).resolve()
-                                        resolved_repo = repo_path.resolve()
-                                        rel_path = str(resolved_file.relative_to(resolved_repo))
-                                    except ValueError:
-                                        # Already relative or different base
-                                        rel_path = file_path
-                                    
-                                    if rel_path not in files_changed:
-                                        files_changed.append(rel_path)
-                                        logger.info("File changed: %s", rel_path)
-
-            # Capture final result from ResultMessage
-            if hasattr(message, "result"):
-                last_result = message.result
+            if not isinstance(message, AssistantMessage) or not message.content:
+                continue
+
+            for block in message.content:
+                # Text blocks are the common case; skip them first
+                if not isinstance(block, ToolUseBlock) or not block.name:
+                    continue
+
+                tool_input = block.input or {}
+                log_tool_call(block.name, tool_input)
+
+                # Track file changes from Edit tool
+                if block.name != "Edit":
+                    continue
+                file_path = tool_input.get("file_path", "")
+                if not file_path:
+                    continue
+
+                rel_path = _relative_to_repo(file_path, repo_prefixes, resolved_repo)
+                if rel_path not in seen_files:
+                    seen_files.add(rel_path)
+                    files_changed.append(rel_path)
+                    logger.info("File changed: %s", rel_path)
 
         logger.info("Fix agent completed. Files changed: %d", len(files_changed))
 
@@ -326,7 +694,7 @@ def format_review_comments(reviews: list[dict], inline_comments: list[dict]) ->
     return review_text, inline_text
 
 
-@weave.op()
+@_traced
 async def run_feedback_fix_agent(
     repo_path: Path,
     task: dict,
@@ -351,7 +719,8 @@ async def run_feedback_fix_agent(
     # Format the review feedback
     review_text, inline_text = format_review_comments(reviews, inline_comments)
 
-    prompt = FIX_FEEDBACK_PROMPT.format(
+    prompt = _render_prompt(
+        _FIX_FEEDBACK_PROMPT_SEGMENTS,
         category=category,
         title=title,
         summary=summary,
@@ -364,50 +733,48 @@ async def run_feedback_fix_agent(
     logger.info("Working directory: %s", repo_path)
 
     files_changed: list[str] = []
+    seen_files: set[str] = set()
     last_result = ""
 
+    # Resolve once up front; resolve() handles the macOS /var -> /private/var symlink
+    resolved_repo = repo_path.resolve()
+    repo_prefixes = (str(repo_path) + os.sep, str(resolved_repo) + os.sep)
+
     try:
-        async for message in query(
-            prompt=prompt,
-            options=ClaudeAgentOptions(
-                cwd=str(repo_path),
-                allowed_tools=["Read", "Edit", "Glob", "Grep", "Bash"],
-                permission_mode="acceptEdits",  # Auto-accept file edits
-            ),
-        ):
+        async for message in _agent_pool.submit(repo_path, FIX_FEEDBACK_SYSTEM_PROMPT, prompt):
             # Log the message class for debugging
-            msg_class = type(message).__name__
-            logger.debug("Agent message: %s", msg_class)
-
-            # Handle AssistantMessage with ToolUseBlock in content
-            if hasattr(message, "content") and isinstance(message.content, list):
-                for block in message.content:
-                    block_type = type(block).__name__
-                    if block_type == "ToolUseBlock":
-                        tool_name = getattr(block, "name", None)
-                        tool_input = getattr(block, "input", {}) or {}
-
-                        if tool_name:
-                            log_tool_call(tool_name, tool_input)
-
-                            # Track file changes from Edit tool
-                            if tool_name == "Edit":
-                                file_path = tool_input.get("file_path", "")
-                                if file_path:
-                                    try:
-                                        resolved_file = Path(file_path).resolve()
-                                        resolved_repo = repo_path.resolve()
-                                        rel_path = str(resolved_file.relative_to(resolved_repo))
-                                    except ValueError:
-                                        rel_path = file_path
-
-                                    if rel_path not in files_changed:
-                                        files_changed.append(rel_path)
-                                        logger.info("File changed: %s", rel_path)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Agent message: %s", type(message).__name__)
 
             # Capture final result from ResultMessage
-            if hasattr(message, "result"):
-                last_result = message.result
+            if isinstance(message, ResultMessage):
+                last_result = message.result or ""
+                continue
+
+            # Handle AssistantMessage with ToolUseBlock in content
+            if not isinstance(message, AssistantMessage) or not message.content:
+                continue
+
+            for block in message.content:
+                # Text blocks are the common case; skip them first
+                if not isinstance(block, ToolUseBlock) or not block.name:
+                    continue
+
+                tool_input = block.input or {}
+                log_tool_call(block.name, tool_input)
+
+                # Track file changes from Edit tool
+                if block.name != "Edit":
+                    continue
+                file_path = tool_input.get("file_path", "")
+                if not file_path:
+                    continue
+
+                rel_path = _relative_to_repo(file_path, repo_prefixes, resolved_repo)
+                if rel_path not in seen_files:
+                    seen_files.add(rel_path)
+                    files_changed.append(rel_path)
+                    logger.info("File changed: %s", rel_path)
 
         logger.info("Feedback fix agent completed. Files changed: %d", len(files_changed))
 
@@ -3,6 +3,7 @@
 import json
 import logging
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,12 @@ _DEFAULT_PRODUCT_REPOS: dict[str, str] = {
 
 _product_repos: dict[str, str] | None = None
 
+# Lowercased product name -> repo, for case-insensitive lookups
+_product_repos_lower: dict[str, str] = {}
+
+# Guards loading the mapping so concurrent callers parse PRODUCT_REPOS once
+_product_repos_lock = threading.Lock()
+
 
 def get_product_repos() -> dict[str, str]:
     """Get the product-to-repo mapping.
@@ -26,21 +33,28 @@ def get_product_repos() -> dict[str, str]:
     Returns:
         Dictionary mapping product names to GitHub repos.
     """
-    global _product_repos
+    global _product_repos, _product_repos_lower
 
     if _product_repos is not None:
         return _product_repos
 
-    env_value = os.getenv("PRODUCT_REPOS")
-    if env_value:
-        try:
-            _product_repos = json.loads(env_value)
-            logger.info("Loaded %d product-repo mappings from env", len(_product_repos))
-        except json.JSONDecodeError as e:
-            logger.error("Failed to parse PRODUCT_REPOS: %s", e)
-            _product_repos = _DEFAULT_PRODUCT_REPOS
-    else:
-        _product_repos = _DEFAULT_PRODUCT_REPOS.copy()
+    with _product_repos_lock:
+        if _product_repos is not None:
+            return _product_repos
+
+        env_value = os.getenv("PRODUCT_REPOS")
+        if env_value:
+            try:
+                repos = json.loads(env_value)
+                logger.info("Loaded %d product-repo mappings from env", len(repos))
+            except json.JSONDecodeError as e:
+                logger.error("Failed to parse PRODUCT_REPOS: %s", e)
+                repos = _DEFAULT_PRODUCT_REPOS
+        else:
+            repos = _DEFAULT_PRODUCT_REPOS.copy()
+
+        _product_repos_lower = {key.lower(): repo for key, repo in repos.items()}
+        _product_repos = repos
 
     return _product_repos
 
@@ -54,13 +68,8 @@ def get_repo_for_product(product: str) -> str | None:
     Returns:
         GitHub repo in "owner/repo" format, or None if not mapped.
     """
-    repos = get_product_repos()
-    # Case-insensitive lookup
-    product_lower = product.lower()
-    for key, repo in repos.items():
-        if key.lower() == product_lower:
-            return repo
-    return None
+    get_product_repos()
+    return _product_repos_lower.get(product.lower())
 
 
 def set_product_repo(product: str, repo: str) -> None:
@@ -72,11 +81,13 @@ def set_product_repo(product: str, repo: str) -> None:
     """
     repos = get_product_repos()
     repos[product] = repo
+    _product_repos_lower[product.lower()] = repo
     logger.info("Set repo for %s: %s", product, repo)
 
 
 def clear_product_repos_cache() -> None:
     """Clear the product repos cache (for testing)."""
-    global _product_repos
+    global _product_repos, _product_repos_lower
     _product_repos = None
+    _product_repos_lower = {}
 
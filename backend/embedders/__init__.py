@@ -1,6 +1,7 @@
 """Embedding providers for text vectorization."""
 
 from embedders.base import BaseEmbedder
+from embedders.cached import CachedEmbedder
 from embedders.local import LocalEmbedder
 
 # Registry of available embedders
@@ -39,5 +40,5 @@ def register_embedder(name: str, embedder_class: type[BaseEmbedder]) -> None:
     _EMBEDDERS[name] = embedder_class
 
 
-__all__ = ["BaseEmbedder", "LocalEmbedder", "get_embedder", "register_embedder"]
+__all__ = ["BaseEmbedder", "CachedEmbedder", "LocalEmbedder", "get_embedder", "register_embedder"]
 
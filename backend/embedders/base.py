@@ -2,6 +2,8 @@
 
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class BaseEmbedder(ABC):
     """Abstract base class for text embedding providers.
@@ -56,3 +58,38 @@ class BaseEmbedder(ABC):
         """
         return [await self.embed(text) for text in texts]
 
+    def close(self) -> None:
+        """Release resources held by the embedder (worker processes, etc.).
+
+        Default implementation does nothing.
+        """
+
+    async def embed_np(self, text: str) -> np.ndarray:
+        """Generate an embedding vector as a float32 array.
+
+        Default implementation converts the result of embed(). Override to
+        return the array directly and skip the Python float list.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            A (dimension,) float32 array.
+        """
+        return np.asarray(await self.embed(text), dtype=np.float32)
+
+    async def embed_batch_np(self, texts: list[str]) -> np.ndarray:
+        """Generate embeddings for multiple texts as one float32 array.
+
+        Default implementation converts the result of embed_batch().
+
+        Args:
+            texts: List of texts to embed.
+
+        Returns:
+            A (len(texts), dimension) float32 array.
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.asarray(await self.embed_batch(texts), dtype=np.float32)
+
@@ -0,0 +1,172 @@
+"""Redis-backed embedding cache keyed by text hash."""
+
+import base64
+import hashlib
+import logging
+import os
+
+import numpy as np
+import redis.asyncio as redis
+
+from embedders.base import BaseEmbedder
+
+logger = logging.getLogger(__name__)
+
+# Key prefix for cached embeddings
+EMBEDDING_CACHE_PREFIX = "emb:"
+
+# How long cached embeddings live in seconds (0 disables the cache)
+EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", "604800"))
+
+
+class CachedEmbedder(BaseEmbedder):
+    """Wraps another embedder, caching its vectors in Redis.
+
+    Vectors are stored as base64-encoded float32 under
+    emb:{model}:f32:{sha256(text)}, so a cache hit returns exactly the vector
+    the model produced and repeated texts skip the forward pass.
+
+    Only worth its Redis round trip for callers that embed the same text more
+    than once; the embed worker doesn't use it, since signals are already
+    deduplicated by normalized-text hash before they are queued.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        redis_client: redis.Redis,
+        ttl: int = EMBEDDING_CACHE_TTL,
+    ):
+        """Initialize the cache.
+
+        Args:
+            embedder: The embedder to cache.
+            redis_client: Redis client instance.
+            ttl: Seconds before a cached vector expires (0 disables the
+                cache; calls go straight to the wrapped embedder).
+        """
+        self.embedder = embedder
+        self.redis = redis_client
+        self.ttl = ttl
+        # Scope keys to the model so switching models doesn't serve stale vectors
+        model = getattr(embedder, "model_name", type(embedder).__name__)
+        self._prefix = f"{EMBEDDING_CACHE_PREFIX}{model}:f32:"
+
+    @property
+    def dimension(self) -> int:
+        """Return the embedding vector dimension."""
+        return self.embedder.dimension
+
+    def close(self) -> None:
+        """Close the wrapped embedder."""
+        self.embedder.close()
+
+    def _key(self, text: str) -> str:
+        """Build the cache key for a text."""
+        return self._prefix + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(embedding: np.ndarray) -> str:
+        """Pack an embedding as base64 float32."""
+        return base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode("ascii")
+
+    @staticmethod
+    def _decode(data: str) -> np.ndarray:
+        """Unpack a base64 float32 embedding."""
+        return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+    async def embed(self, text: str) -> list[float]:
+        """Generate an embedding vector, using the cache when possible.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            A list of floats representing the embedding vector.
+        """
+        return (await self.embed_np(text)).tolist()
+
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for multiple texts, embedding only cache misses.
+
+        Args:
+            texts: List of texts to embed.
+
+        Returns:
+            List of embedding vectors.
+        """
+        return (await self.embed_batch_np(texts)).tolist()
+
+    async def embed_np(self, text: str) -> np.ndarray:
+        """Generate an embedding vector as a float32 array, using the cache when possible.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            A (dimension,) float32 array.
+        """
+        if self.ttl <= 0:
+            return await self.embedder.embed_np(text)
+
+        key = self._key(text)
+        try:
+            cached = await self.redis.get(key)
+            if cached:
+                return self._decode(cached)
+        except Exception as e:
+            logger.debug("Embedding cache lookup failed: %s", e)
+
+        embedding = await self.embedder.embed_np(text)
+
+        try:
+            await self.redis.set(key, self._encode(embedding), ex=self.ttl)
+        except Exception as e:
+            logger.debug("Embedding cache store failed: %s", e)
+
+        return embedding
+
+    async def embed_batch_np(self, texts: list[str]) -> np.ndarray:
+        """Generate embeddings as one float32 array, embedding only cache misses.
+
+        Args:
+            texts: List of texts to embed.
+
+        Returns:
+            A (len(texts), dimension) float32 array.
+        """
+        if self.ttl <= 0:
+            return await self.embedder.embed_batch_np(texts)
+
+        results = np.empty((len(texts), self.dimension), dtype=np.float32)
+        if not texts:
+            return results
+
+        keys = [self._key(text) for text in texts]
+        try:
+            cached = await self.redis.mget(keys)
+        except Exception as e:
+            logger.debug("Embedding cache lookup failed: %s", e)
+            cached = [None] * len(texts)
+
+        misses = []
+        for i, data in enumerate(cached):
+            if data:
+                results[i] = self._decode(data)
+            else:
+                misses.append(i)
+        if not misses:
+            return results
+
+        embeddings = await self.embedder.embed_batch_np([texts[i] for i in misses])
+        results[misses] = embeddings
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for i, embedding in zip(misses, embeddings):
+                    pipe.set(keys[i], self._encode(embedding), ex=self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.debug("Embedding cache store failed: %s", e)
+
+        return results
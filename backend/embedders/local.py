@@ -1,8 +1,11 @@
 """Local embedder using sentence-transformers."""
 
+import asyncio
+import functools
 import logging
 import os
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from embedders.base import BaseEmbedder
@@ -12,6 +15,46 @@ logger = logging.getLogger(__name__)
 # Default model: all-MiniLM-L6-v2 is fast and good quality (384 dimensions)
 DEFAULT_MODEL = "all-MiniLM-L6-v2"
 
+# Inference backend: "torch" or "onnx" (ONNX Runtime with INT8-quantized
+# weights, roughly 2-4x faster on CPU; needs sentence-transformers[onnx])
+DEFAULT_BACKEND = "torch"
+
+# Quantized ONNX weights loaded by the onnx backend. The default model's hub
+# repo ships this dynamic INT8 (AVX-512 VNNI) variant; for other models create
+# one with sentence_transformers.export_dynamic_quantized_onnx_model.
+DEFAULT_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Model name suffixes selecting a quantized variant of the named model:
+# "-int8" loads the INT8 ONNX weights (same as EMBEDDING_BACKEND=onnx) and
+# "-int4" loads NF4 4-bit weights through bitsandbytes (CUDA only)
+INT8_SUFFIX = "-int8"
+INT4_SUFFIX = "-int4"
+
+# Torch backend precision: "fp32", "fp16" (CUDA only) or "bf16" (CPUs with
+# AVX-512 BF16/AMX; optimized with intel_extension_for_pytorch if installed)
+DEFAULT_DTYPE = "fp32"
+
+# Compile the torch transformer with torch.compile (fuses small kernels;
+# the first forward pass after loading is slow while it compiles)
+DEFAULT_COMPILE = "false"
+
+# Texts per forward pass in embed_batch unless EMBEDDING_BATCH_SIZE is set;
+# a GPU needs larger batches to stay saturated
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_GPU_BATCH_SIZE = 256
+
+# Worker processes for large embed_batch calls on CPU (0 or 1 disables);
+# one torch process can't keep many cores busy
+EMBEDDING_MP_WORKERS = int(os.getenv("EMBEDDING_MP_WORKERS", "0"))
+
+# Smallest embed_batch call that is spread across the worker processes
+EMBEDDING_MP_MIN_BATCH = int(os.getenv("EMBEDDING_MP_MIN_BATCH", "1000"))
+
+# Recently embedded texts whose tokenized features (CPU tensors, moved to
+# the model's device per call) are kept for reuse by single-text embed()
+# calls (retries, repeated queries)
+TOKEN_CACHE_SIZE = int(os.getenv("EMBEDDING_TOKEN_CACHE_SIZE", "4096"))
+
 
 class LocalEmbedder(BaseEmbedder):
     """Local embedding provider using sentence-transformers.
@@ -20,21 +63,190 @@ class LocalEmbedder(BaseEmbedder):
     - 384-dimensional embeddings
     - Fast inference (even on CPU)
     - Good semantic similarity performance
+
+    With the "onnx" backend the transformer runs through ONNX Runtime on
+    INT8-quantized weights; pooling and normalization are unchanged. A model
+    name ending in "-int8" (e.g. all-MiniLM-L6-v2-int8) selects that backend,
+    and one ending in "-int4" loads the torch model with NF4 weights.
     """
 
-    def __init__(self, model_name: str | None = None):
+    def __init__(
+        self,
+        model_name: str | None = None,
+        backend: str | None = None,
+        device: str | None = None,
+    ):
         """Initialize the local embedder.
 
         Args:
-            model_name: Name of the sentence-transformers model to use.
-                       Defaults to EMBEDDING_MODEL env var or all-MiniLM-L6-v2.
+            model_name: Name of the sentence-transformers model to use, with
+                       an optional "-int8" or "-int4" suffix. Defaults to
+                       EMBEDDING_MODEL env var or all-MiniLM-L6-v2.
+            backend: "torch" or "onnx". Defaults to EMBEDDING_BACKEND env var
+                     or torch. Falls back to torch if the ONNX model can't be
+                     loaded.
+            device: Device to run on ("cpu", "cuda", "cuda:1", ...). Defaults
+                    to EMBEDDING_DEVICE env var, else CUDA when available.
         """
         self.model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
-        logger.info("Loading sentence-transformers model: %s", self.model_name)
-        self._model = SentenceTransformer(self.model_name)
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", DEFAULT_BACKEND)
+        self.device = device or os.getenv("EMBEDDING_DEVICE") or self._default_device()
+        # model_name keeps the suffix so caches keyed on it separate variants
+        self._load_name = self.model_name
+        self.quantization = None
+        if self.model_name.endswith(INT8_SUFFIX):
+            self._load_name = self.model_name.removesuffix(INT8_SUFFIX)
+            self.backend = "onnx"
+        elif self.model_name.endswith(INT4_SUFFIX):
+            self._load_name = self.model_name.removesuffix(INT4_SUFFIX)
+            self.backend = "torch"
+            self.quantization = "int4"
+        logger.info(
+            "Loading sentence-transformers model: %s (backend: %s, device: %s)",
+            self.model_name,
+            self.backend,
+            self.device,
+        )
+        # eval() disables dropout for the direct forward passes in _encode_one
+        self._model = self._load_model().eval()
+        if self.backend == "torch" and self.quantization is None:
+            self._apply_dtype(os.getenv("EMBEDDING_DTYPE", DEFAULT_DTYPE))
+            if os.getenv("EMBEDDING_COMPILE", DEFAULT_COMPILE).lower() == "true":
+                self._compile()
         self._dimension = self._model.get_sentence_embedding_dimension()
+        batch_size = os.getenv("EMBEDDING_BATCH_SIZE")
+        if batch_size:
+            self.batch_size = int(batch_size)
+        elif self._model.device.type == "cuda":
+            self.batch_size = DEFAULT_GPU_BATCH_SIZE
+        else:
+            self.batch_size = DEFAULT_BATCH_SIZE
+        # Multi-process pool, started on the first large CPU batch
+        self._pool = None
+        self._tokenize_one = functools.lru_cache(maxsize=TOKEN_CACHE_SIZE)(self._tokenize)
         logger.info("Model loaded, dimension: %d", self._dimension)
 
+    @staticmethod
+    def _default_device() -> str:
+        """Pick CUDA when available, else CPU."""
+        import torch
+
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+    def _load_model(self) -> SentenceTransformer:
+        """Load the model for the configured backend."""
+        if self.backend == "onnx":
+            onnx_file = os.getenv("EMBEDDING_ONNX_FILE", DEFAULT_ONNX_FILE)
+            try:
+                return SentenceTransformer(
+                    self._load_name,
+                    device=self.device,
+                    backend="onnx",
+                    model_kwargs={"file_name": onnx_file},
+                )
+            except Exception as e:
+                logger.warning(
+                    "Failed to load ONNX model %s, falling back to torch: %s",
+                    onnx_file,
+                    e,
+                )
+                self.backend = "torch"
+
+        if self.quantization == "int4":
+            try:
+                return self._load_int4_model()
+            except Exception as e:
+                logger.warning("Failed to load NF4 model, falling back to full precision: %s", e)
+                self.quantization = None
+
+        return SentenceTransformer(self._load_name, device=self.device)
+
+    def _load_int4_model(self) -> SentenceTransformer:
+        """Load the torch model with NF4 4-bit weights via bitsandbytes."""
+        import torch
+        from transformers import BitsAndBytesConfig
+
+        quantization_config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.float16,
+        )
+        return SentenceTransformer(
+            self._load_name,
+            device=self.device,
+            model_kwargs={"quantization_config": quantization_config},
+        )
+
+    def _apply_dtype(self, dtype: str) -> None:
+        """Cast the torch model to reduced precision.
+
+        Args:
+            dtype: "fp32", "fp16" or "bf16". fp16 is skipped unless the model
+                is on a CUDA device.
+        """
+        if dtype == "fp16":
+            if self._model.device.type != "cuda":
+                logger.warning("EMBEDDING_DTYPE=fp16 needs CUDA, using fp32")
+                return
+            self._model = self._model.half()
+        elif dtype == "bf16":
+            import torch
+
+            self._model = self._model.to(torch.bfloat16).eval()
+            try:
+                import intel_extension_for_pytorch as ipex
+
+                self._model = ipex.optimize(self._model, dtype=torch.bfloat16)
+            except ImportError:
+                logger.debug("intel_extension_for_pytorch not installed, using plain bf16")
+        elif dtype != "fp32":
+            logger.warning("Unknown EMBEDDING_DTYPE %r, using fp32", dtype)
+            return
+
+        logger.info("Embedding model running in %s", dtype)
+
+    def _compile(self) -> None:
+        """Compile the transformer forward with torch.compile and warm it up.
+
+        Falls back to eager execution if compilation fails (e.g. no C++
+        toolchain for the CPU inductor backend).
+        """
+        import torch
+
+        transformer = self._model[0]
+        eager_model = transformer.auto_model
+        try:
+            transformer.auto_model = torch.compile(
+                eager_model, mode="reduce-overhead", dynamic=True
+            )
+            # Trigger compilation now rather than on the first real request
+            with torch.inference_mode():
+                self._model.encode("warmup")
+        except Exception as e:
+            logger.warning("torch.compile failed, running eager: %s", e)
+            transformer.auto_model = eager_model
+            return
+
+        logger.info("Embedding model compiled with torch.compile")
+
+    def _tokenize(self, text: str) -> dict:
+        """Tokenize a single text into model-ready features (on the CPU)."""
+        return dict(self._model.tokenize([text]))
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        """Embed a single text with one direct forward pass.
+
+        Skips encode()'s per-call sorting, batching and output conversion,
+        and reuses cached features for recently seen texts.
+        """
+        import torch
+
+        device = self._model.device
+        features = {name: value.to(device) for name, value in self._tokenize_one(text).items()}
+        with torch.inference_mode():
+            output = self._model(features)
+        return output["sentence_embedding"][0].float().cpu().numpy()
+
     @property
     def dimension(self) -> int:
         """Return the embedding vector dimension."""
@@ -49,22 +261,90 @@ class LocalEmbedder(BaseEmbedder):
         Returns:
             A list of floats representing the embedding vector.
         """
-        # sentence-transformers is sync, but we wrap it for async compatibility
-        embedding = self._model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return (await self.embed_np(text)).tolist()
 
     async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for multiple texts.
+
+        Args:
+            texts: List of texts to embed.
+
+        Returns:
+            List of embedding vectors.
+        """
+        return (await self.embed_batch_np(texts)).tolist()
+
+    async def embed_np(self, text: str) -> np.ndarray:
+        """Generate an embedding vector for the given text as a float32 array.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            A (dimension,) float32 array.
+        """
+        # sentence-transformers is sync; encode in a worker thread (torch
+        # releases the GIL) so the event loop keeps serving other requests
+        if self.backend == "torch":
+            return await asyncio.to_thread(self._encode_one, text)
+        embedding = await asyncio.to_thread(self._model.encode, text, convert_to_numpy=True)
+        return embedding.astype(np.float32, copy=False)
+
+    async def embed_batch_np(self, texts: list[str]) -> np.ndarray:
         """Generate embeddings for multiple texts efficiently.
 
         sentence-transformers supports batch encoding which is faster
-        than encoding one at a time.
+        than encoding one at a time. encode() sorts the texts by length
+        before batching (and restores the order afterwards), so each batch
+        is padded only to the length of similar-sized texts.
 
         Args:
             texts: List of texts to embed.
 
         Returns:
-            List of embedding vectors.
+            A (len(texts), dimension) float32 array.
+        """
+        if not texts:
+            return np.empty((0, self._dimension), dtype=np.float32)
+        return await asyncio.to_thread(self._encode_batch, texts)
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        """Encode texts with encode() under inference_mode.
+
+        Large CPU batches are split across the worker process pool when
+        EMBEDDING_MP_WORKERS is set.
         """
-        embeddings = self._model.encode(texts, convert_to_numpy=True)
-        return [emb.tolist() for emb in embeddings]
+        import torch
+
+        kwargs = {}
+        if (
+            EMBEDDING_MP_WORKERS > 1
+            and self._model.device.type == "cpu"
+            and len(texts) >= EMBEDDING_MP_MIN_BATCH
+        ):
+            kwargs["pool"] = self._get_pool()
+
+        with torch.inference_mode():
+            embeddings = self._model.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+                **kwargs,
+            )
+        # fp16/bf16 models can hand back half-precision arrays
+        return embeddings.astype(np.float32, copy=False)
+
+    def _get_pool(self) -> dict:
+        """Start the multi-process encode pool on first use."""
+        if self._pool is None:
+            logger.info("Starting %d embedding worker processes", EMBEDDING_MP_WORKERS)
+            self._pool = self._model.start_multi_process_pool(["cpu"] * EMBEDDING_MP_WORKERS)
+        return self._pool
 
+    def close(self) -> None:
+        """Stop the multi-process encode pool and drop cached features."""
+        self._tokenize_one.cache_clear()
+        if self._pool is not None:
+            self._model.stop_multi_process_pool(self._pool)
+            self._pool = None
@@ -3,6 +3,7 @@
 from github.client import (
     GitHubClient,
     GitHubIssue,
+    PRCommentBatch,
     PRReview,
     PRReviewComment,
     create_github_issue,
@@ -16,6 +17,7 @@ from github.issue_formatter import (
 __all__ = [
     "GitHubClient",
     "GitHubIssue",
+    "PRCommentBatch",
     "PRReview",
     "PRReviewComment",
     "create_github_issue",
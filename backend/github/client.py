@@ -1,15 +1,29 @@
 """GitHub API client for creating issues."""
 
+import asyncio
+import json
 import logging
 import os
 from dataclasses import dataclass
 
 import httpx
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Optional: faster parsing of large review/comment payloads
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 GITHUB_API_URL = "https://api.github.com"
 
+# Items per page for list endpoints (GitHub's maximum; the default is 30)
+GITHUB_PER_PAGE = 100
+
+# Extra headers for requests with a JSON body
+JSON_CONTENT_HEADERS = {"Content-Type": "application/json"}
+
 
 @dataclass
 class GitHubIssue:
@@ -46,6 +60,42 @@ class PRReview:
     html_url: str
 
 
+@dataclass
+class PRCommentBatch:
+    """Review comments on a pull request, stored column-wise.
+
+    Parallel arrays (one entry per comment) for scanning many comments at
+    once, e.g. np.isin(batch.paths, files_changed). lines uses -1 where the
+    comment is outdated (PRReviewComment.line is None).
+    """
+
+    ids: np.ndarray
+    bodies: list[str]
+    paths: np.ndarray
+    lines: np.ndarray
+    sides: list[str]
+    users: list[str]
+    created_at: list[str]
+    html_urls: list[str]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _json_loads(content: bytes):
+    """Parse a JSON response body, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps(payload: dict) -> bytes:
+    """Serialize a JSON request body, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
 class GitHubClient:
     """Client for interacting with the GitHub API."""
 
@@ -61,6 +111,64 @@ class GitHubClient:
                 "GitHub token not provided. Set GITHUB_TOKEN environment variable."
             )
 
+        self._headers = {
+            "Authorization": f"Bearer {self._token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+
+        # One client per GitHubClient so requests reuse the TLS connection
+        self._client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            headers=self._headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "GitHubClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _get_paginated(self, url: str) -> list[dict]:
+        """Fetch every page of a GitHub list endpoint.
+
+        The first page's Link header gives the last page number; the
+        remaining pages are then fetched concurrently.
+
+        Args:
+            url: API path of the list endpoint.
+
+        Returns:
+            The items from all pages, in order.
+
+        Raises:
+            httpx.HTTPStatusError: If any page request fails.
+        """
+        response = await self._client.get(url, params={"per_page": GITHUB_PER_PAGE, "page": 1})
+        response.raise_for_status()
+        items = _json_loads(response.content)
+
+        last = response.links.get("last")
+        if not last:
+            return items
+
+        last_page = int(httpx.URL(last["url"]).params.get("page", 1))
+        responses = await asyncio.gather(*(
+            self._client.get(url, params={"per_page": GITHUB_PER_PAGE, "page": page})
+            for page in range(2, last_page + 1)
+        ))
+        for response in responses:
+            response.raise_for_status()
+            items.extend(_json_loads(response.content))
+
+        return items
+
     async def create_issue(
         self,
         repo: str,
@@ -82,13 +190,7 @@ class GitHubClient:
         Raises:
             httpx.HTTPStatusError: If the API request fails.
         """
-        url = f"{GITHUB_API_URL}/repos/{repo}/issues"
-
-        headers = {
-            "Authorization": f"Bearer {self._token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
+        url = f"/repos/{repo}/issues"
 
         payload = {
             "title": title,
@@ -100,15 +202,13 @@ class GitHubClient:
 
         logger.info("Creating issue in %s: %s", repo, title[:50])
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await self._client.post(
+            url,
+            content=_json_dumps(payload),
+            headers=JSON_CONTENT_HEADERS,
+        )
+        response.raise_for_status()
+        data = _json_loads(response.content)
 
         issue = GitHubIssue(
             number=data["number"],
@@ -129,33 +229,23 @@ class GitHubClient:
         Returns:
             List of PRReview objects.
         """
-        url = f"{GITHUB_API_URL}/repos/{repo}/pulls/{pr_number}/reviews"
-
-        headers = {
-            "Authorization": f"Bearer {self._token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
+        url = f"/repos/{repo}/pulls/{pr_number}/reviews"
 
         logger.info("Fetching reviews for %s PR #%d", repo, pr_number)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-
-        reviews = []
-        for review in data:
-            reviews.append(
-                PRReview(
-                    id=review["id"],
-                    body=review.get("body", "") or "",
-                    state=review["state"],
-                    user=review["user"]["login"],
-                    submitted_at=review.get("submitted_at"),
-                    html_url=review["html_url"],
-                )
+        data = await self._get_paginated(url)
+
+        reviews = [
+            PRReview(
+                id=review["id"],
+                body=review.get("body", "") or "",
+                state=review["state"],
+                user=review["user"]["login"],
+                submitted_at=review.get("submitted_at"),
+                html_url=review["html_url"],
             )
+            for review in data
+        ]
 
         logger.info("Fetched %d reviews for PR #%d", len(reviews), pr_number)
         return reviews
@@ -170,39 +260,74 @@ class GitHubClient:
         Returns:
             List of PRReviewComment objects with file/line context.
         """
-        url = f"{GITHUB_API_URL}/repos/{repo}/pulls/{pr_number}/comments"
-
-        headers = {
-            "Authorization": f"Bearer {self._token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
+        url = f"/repos/{repo}/pulls/{pr_number}/comments"
 
         logger.info("Fetching review comments for %s PR #%d", repo, pr_number)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-
-        comments = []
-        for comment in data:
-            comments.append(
-                PRReviewComment(
-                    id=comment["id"],
-                    body=comment["body"],
-                    path=comment["path"],
-                    line=comment.get("line"),  # Can be None for outdated comments
-                    side=comment.get("side", "RIGHT"),
-                    user=comment["user"]["login"],
-                    created_at=comment["created_at"],
-                    html_url=comment["html_url"],
-                )
+        data = await self._get_paginated(url)
+
+        comments = [
+            PRReviewComment(
+                id=comment["id"],
+                body=comment["body"],
+                path=comment["path"],
+                line=comment.get("line"),  # Can be None for outdated comments
+                side=comment.get("side", "RIGHT"),
+                user=comment["user"]["login"],
+                created_at=comment["created_at"],
+                html_url=comment["html_url"],
             )
+            for comment in data
+        ]
 
         logger.info("Fetched %d review comments for PR #%d", len(comments), pr_number)
         return comments
 
+    async def get_pr_comments_batch(self, repo: str, pr_number: int) -> PRCommentBatch:
+        """Fetch all review comments for a pull request as a PRCommentBatch.
+
+        Same data as get_pr_comments without a dataclass per comment.
+
+        Args:
+            repo: Repository in "owner/repo" format.
+            pr_number: Pull request number.
+
+        Returns:
+            PRCommentBatch with one entry per comment.
+        """
+        url = f"/repos/{repo}/pulls/{pr_number}/comments"
+
+        logger.info("Fetching review comments for %s PR #%d", repo, pr_number)
+
+        data = await self._get_paginated(url)
+
+        count = len(data)
+        ids = np.empty(count, dtype=np.int64)
+        lines = np.empty(count, dtype=np.int64)
+        bodies, paths, sides, users, created_at, html_urls = [], [], [], [], [], []
+        for i, comment in enumerate(data):
+            ids[i] = comment["id"]
+            line = comment.get("line")  # Can be None for outdated comments
+            lines[i] = -1 if line is None else line
+            bodies.append(comment["body"])
+            paths.append(comment["path"])
+            sides.append(comment.get("side", "RIGHT"))
+            users.append(comment["user"]["login"])
+            created_at.append(comment["created_at"])
+            html_urls.append(comment["html_url"])
+
+        logger.info("Fetched %d review comments for PR #%d", count, pr_number)
+        return PRCommentBatch(
+            ids=ids,
+            bodies=bodies,
+            paths=np.array(paths, dtype=object),
+            lines=lines,
+            sides=sides,
+            users=users,
+            created_at=created_at,
+            html_urls=html_urls,
+        )
+
 
 # Convenience function for quick issue creation
 async def create_github_issue(
@@ -224,6 +349,6 @@ async def create_github_issue(
     Returns:
         GitHubIssue with the created issue details.
     """
-    client = GitHubClient(token=token)
-    return await client.create_issue(repo, title, body, labels)
+    async with GitHubClient(token=token) as client:
+        return await client.create_issue(repo, title, body, labels)
 
@@ -1,6 +1,8 @@
 """Clustering logic using Redis vector search."""
 
+import asyncio
 import base64
+import heapq
 import logging
 import os
 import struct
@@ -12,9 +14,9 @@ import numpy as np
 import redis.asyncio as redis
 from redis.commands.search.query import Query
 
-from ingest.dedupe import update_signal_topic
+from ingest.dedupe import SIGNAL_PREFIX, update_signal_topic
 from redis_setup import TOPICS_INDEX
-from tasks.storage import push_to_classify_queue
+from tasks.storage import CLASSIFY_QUEUE, push_to_classify_queue
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,13 @@ TRIAGE_QUEUE = "queue:triage"
 THRESHOLD_HIGH = float(os.getenv("CLUSTER_THRESHOLD_HIGH", "0.75"))
 THRESHOLD_LOW = float(os.getenv("CLUSTER_THRESHOLD_LOW", "0.60"))
 
+# Topic centroids are kept for Python in float16 (half the bytes of float32)
+# under CENTROID_FIELD; topics written before that still have float32
+# embedding_b64, which is read as a fallback and dropped on the next update.
+# The vector index field ("embedding") stays float32, as the index expects.
+CENTROID_FIELD = "embedding_f16"
+LEGACY_CENTROID_FIELD = "embedding_b64"
+
 
 @dataclass
 class ClusterResult:
@@ -37,29 +46,57 @@ class ClusterResult:
     similarity: float | None
 
 
-def embedding_to_bytes(embedding: list[float]) -> bytes:
-    """Convert embedding list to bytes for Redis vector search.
+def embedding_to_bytes(embedding: list[float] | np.ndarray) -> bytes:
+    """Convert embedding to float32 bytes for Redis vector search.
 
     Args:
-        embedding: List of floats.
+        embedding: List of floats or float array.
 
     Returns:
         Packed bytes.
     """
-    return struct.pack(f"{len(embedding)}f", *embedding)
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def embedding_to_base64(embedding: list[float] | np.ndarray) -> str:
+    """Convert embedding to base64 string for Redis hash storage.
+
+    Args:
+        embedding: List of floats or float array.
+
+    Returns:
+        Base64-encoded string.
+    """
+    return base64.b64encode(embedding_to_bytes(embedding)).decode("ascii")
 
 
-def embedding_to_base64(embedding: list[float]) -> str:
-    """Convert embedding list to base64 string for Redis hash storage.
+def centroid_to_base64(embedding: list[float] | np.ndarray) -> str:
+    """Convert a topic centroid to base64 float16 for CENTROID_FIELD.
 
     Args:
-        embedding: List of floats.
+        embedding: List of floats or float array.
 
     Returns:
         Base64-encoded string.
     """
-    raw_bytes = struct.pack(f"{len(embedding)}f", *embedding)
-    return base64.b64encode(raw_bytes).decode("ascii")
+    return base64.b64encode(np.asarray(embedding, dtype=np.float16).tobytes()).decode("ascii")
+
+
+def decode_centroid(f16_data: str | None, legacy_data: str | None) -> np.ndarray | None:
+    """Decode a topic centroid from its stored fields.
+
+    Args:
+        f16_data: The topic's CENTROID_FIELD value, if any.
+        legacy_data: The topic's LEGACY_CENTROID_FIELD value, if any.
+
+    Returns:
+        The centroid as a float32 array, or None if the topic has neither.
+    """
+    if f16_data:
+        return np.frombuffer(base64.b64decode(f16_data), dtype=np.float16).astype(np.float32)
+    if legacy_data:
+        return np.frombuffer(base64.b64decode(legacy_data), dtype=np.float32)
+    return None
 
 
 def base64_to_embedding(data: str, dimension: int) -> list[float]:
@@ -89,9 +126,14 @@ def bytes_to_embedding(data: bytes, dimension: int) -> list[float]:
     return list(struct.unpack(f"{dimension}f", data))
 
 
+def _topic_title(signal_text: str) -> str:
+    """Create a topic title from the signal text (truncated if too long)."""
+    return signal_text[:100] + "..." if len(signal_text) > 100 else signal_text
+
+
 async def find_similar_topics(
     client: redis.Redis,
-    embedding: list[float],
+    embedding: list[float] | np.ndarray,
     k: int = 5,
 ) -> list[tuple[str, float]]:
     """Find the most similar topics using KNN search.
@@ -141,7 +183,7 @@ async def cluster_signal(
     client: redis.Redis,
     signal_hash: str,
     signal_text: str,
-    embedding: list[float],
+    embedding: list[float] | np.ndarray,
     product: str | None = None,
 ) -> ClusterResult:
     """Cluster a signal into an existing or new topic.
@@ -200,11 +242,167 @@ async def cluster_signal(
     )
 
 
+async def cluster_signals_batch(
+    client: redis.Redis,
+    signal_hashes: list[str],
+    texts: list[str],
+    embeddings: np.ndarray,
+    products: list[str | None] | None = None,
+) -> list[ClusterResult]:
+    """Cluster a batch of signals into existing or new topics.
+
+    Gives the same assignments as calling cluster_signal for each signal in
+    order, with the Redis round trips and similarity math done per batch:
+    the KNN searches run concurrently, the candidate topics' centroids are
+    fetched in one pipeline and scored against every signal in a single
+    matrix product, and all topic and signal writes go out in one pipeline.
+
+    Signals are still assigned in order, so a signal can join a topic created
+    earlier in the same batch. Similarities are computed against each topic's
+    centroid as of the start of the batch (or its first signal, for a new
+    topic); the stored centroids include every signal attached.
+
+    Args:
+        client: Redis client.
+        signal_hashes: The signal hashes, in queue order.
+        texts: The signal texts (for new topic titles).
+        embeddings: (n, d) array of the signals' embedding vectors.
+        products: The product name for each signal.
+
+    Returns:
+        ClusterResult for each signal, in order.
+    """
+    if not signal_hashes:
+        return []
+    if products is None:
+        products = [None] * len(signal_hashes)
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+
+    # Candidate topics are the union of every signal's nearest neighbours
+    matches = await asyncio.gather(*(find_similar_topics(client, e) for e in embeddings))
+    candidate_ids = list(dict.fromkeys(topic_id for found in matches for topic_id, _ in found))
+
+    topic_ids: list[str] = []
+    centroids: list[np.ndarray] = []
+    counts: list[int] = []
+    if candidate_ids:
+        async with client.pipeline(transaction=False) as pipe:
+            for topic_id in candidate_ids:
+                pipe.hmget(
+                    f"{TOPIC_PREFIX}{topic_id}",
+                    ["signal_count", CENTROID_FIELD, LEGACY_CENTROID_FIELD],
+                )
+            rows = await pipe.execute()
+        for topic_id, (signal_count, f16_data, legacy_data) in zip(candidate_ids, rows):
+            centroid = decode_centroid(f16_data, legacy_data)
+            if centroid is None:
+                continue
+            topic_ids.append(topic_id)
+            centroids.append(centroid)
+            counts.append(int(signal_count) if signal_count else 1)
+
+    # Cosine similarity of every signal to every candidate (as RediSearch's
+    # COSINE distance does, 1 - distance)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    unit = embeddings / np.maximum(norms, np.finfo(np.float32).tiny)
+    if centroids:
+        matrix = np.stack(centroids)
+        matrix /= np.maximum(
+            np.linalg.norm(matrix, axis=1, keepdims=True), np.finfo(np.float32).tiny
+        )
+        sims = np.dot(unit, matrix.T)
+    else:
+        sims = np.empty((len(embeddings), 0), dtype=np.float32)
+
+    sums = [np.zeros(embeddings.shape[1], dtype=np.float32) for _ in topic_ids]
+    attached = [0] * len(topic_ids)
+    created: dict[int, int] = {}  # topic index -> index of the signal that created it
+    triage: list[str] = []
+    results: list[ClusterResult] = []
+
+    for i, signal_hash in enumerate(signal_hashes):
+        row = sims[i]
+        best = int(row.argmax()) if row.size else -1
+        best_similarity = float(row[best]) if row.size else 0.0
+
+        if best >= 0 and best_similarity >= THRESHOLD_HIGH:
+            # High confidence match - attach to topic
+            sums[best] += embeddings[i]
+            attached[best] += 1
+            results.append(ClusterResult(topic_ids[best], "attached", best_similarity))
+        elif best >= 0 and best_similarity >= THRESHOLD_LOW:
+            # Low confidence - add to triage queue
+            triage.append(f"{signal_hash}:{topic_ids[best]}")
+            results.append(ClusterResult(topic_ids[best], "triage", best_similarity))
+        else:
+            # No match or low similarity - create new topic, which later
+            # signals in the batch are also scored against
+            created[len(topic_ids)] = i
+            topic_ids.append(str(uuid.uuid4())[:8])
+            counts.append(1)
+            sums.append(np.zeros(embeddings.shape[1], dtype=np.float32))
+            attached.append(0)
+            sims = np.column_stack((sims, np.dot(unit, unit[i])))
+            results.append(ClusterResult(topic_ids[-1], "created", None))
+
+    now = int(time.time())
+    async with client.pipeline(transaction=False) as pipe:
+        for j, topic_id in enumerate(topic_ids):
+            topic_key = f"{TOPIC_PREFIX}{topic_id}"
+            signal_count = counts[j] + attached[j]
+            if j in created:
+                i = created[j]
+                centroid = (embeddings[i] + sums[j]) / signal_count
+                pipe.hset(
+                    topic_key,
+                    mapping={
+                        "title": _topic_title(texts[i]),
+                        "summary": "",
+                        "status": "open",
+                        "product": products[i] or "",
+                        "signal_count": signal_count,
+                        "created_at": now,
+                        "updated_at": now,
+                        "embedding": embedding_to_bytes(centroid),
+                        CENTROID_FIELD: centroid_to_base64(centroid),
+                    },
+                )
+            elif attached[j]:
+                # new_centroid = (old_centroid * count + sum(new_vecs)) / (count + n)
+                centroid = (centroids[j] * counts[j] + sums[j]) / signal_count
+                pipe.hset(
+                    topic_key,
+                    mapping={
+                        "embedding": embedding_to_bytes(centroid),
+                        CENTROID_FIELD: centroid_to_base64(centroid),
+                        "signal_count": signal_count,
+                        "updated_at": now,
+                    },
+                )
+                pipe.hdel(topic_key, LEGACY_CENTROID_FIELD)
+        for signal_hash, result in zip(signal_hashes, results):
+            pipe.hset(f"{SIGNAL_PREFIX}{signal_hash}", "topic_id", result.topic_id)
+        if triage:
+            pipe.rpush(TRIAGE_QUEUE, *triage)
+        if created:
+            pipe.rpush(CLASSIFY_QUEUE, *(topic_ids[j] for j in created))
+        await pipe.execute()
+
+    logger.info(
+        "Clustered %d signals: %d attached, %d triaged, %d new topics",
+        len(results),
+        sum(attached),
+        len(triage),
+        len(created),
+    )
+    return results
+
+
 async def attach_signal_to_topic(
     client: redis.Redis,
     signal_hash: str,
     topic_id: str,
-    embedding: list[float],
+    embedding: list[float] | np.ndarray,
 ) -> None:
     """Attach a signal to an existing topic and update centroid.
 
@@ -216,30 +414,28 @@ async def attach_signal_to_topic(
     """
     topic_key = f"{TOPIC_PREFIX}{topic_id}"
 
-    # Get current signal count
-    signal_count_str = await client.hget(topic_key, "signal_count")
+    # Get current signal count and centroid
+    signal_count_str, f16_data, legacy_data = await client.hmget(
+        topic_key, ["signal_count", CENTROID_FIELD, LEGACY_CENTROID_FIELD]
+    )
     signal_count = int(signal_count_str) if signal_count_str else 1
 
-    # Get current embedding (stored as base64)
-    current_emb_b64 = await client.hget(topic_key, "embedding_b64")
-    if current_emb_b64:
-        current_emb = base64_to_embedding(current_emb_b64, len(embedding))
-
+    current_arr = decode_centroid(f16_data, legacy_data)
+    if current_arr is not None:
         # Update centroid incrementally:
         # new_centroid = (old_centroid * count + new_vec) / (count + 1)
-        current_arr = np.array(current_emb)
-        new_arr = np.array(embedding)
-        updated_arr = (current_arr * signal_count + new_arr) / (signal_count + 1)
-        updated_emb = updated_arr.tolist()
+        new_arr = np.asarray(embedding, dtype=np.float32)
+        updated_emb = (current_arr * signal_count + new_arr) / (signal_count + 1)
 
-        # Store updated embedding (base64 for retrieval, bytes for vector search)
+        # Store updated embedding (float16 base64 for retrieval, bytes for vector search)
         await client.hset(
             topic_key,
             mapping={
                 "embedding": embedding_to_bytes(updated_emb),
-                "embedding_b64": embedding_to_base64(updated_emb),
+                CENTROID_FIELD: centroid_to_base64(updated_emb),
             },
         )
+        await client.hdel(topic_key, LEGACY_CENTROID_FIELD)
 
     # Update signal count and timestamp
     await client.hset(
@@ -265,7 +461,7 @@ async def create_topic(
     client: redis.Redis,
     signal_hash: str,
     signal_text: str,
-    embedding: list[float],
+    embedding: list[float] | np.ndarray,
     product: str | None = None,
 ) -> str:
     """Create a new topic from a signal.
@@ -285,12 +481,11 @@ async def create_topic(
 
     now = int(time.time())
 
-    # Create a title from the signal text (truncate if too long)
-    title = signal_text[:100] + "..." if len(signal_text) > 100 else signal_text
+    title = _topic_title(signal_text)
 
     # Store topic metadata with embedding for vector search
     # embedding: raw bytes for RediSearch vector index
-    # embedding_b64: base64 for Python retrieval (decode_responses=True)
+    # embedding_f16: float16 base64 for Python retrieval (decode_responses=True)
     await client.hset(
         topic_key,
         mapping={
@@ -302,7 +497,7 @@ async def create_topic(
             "created_at": now,
             "updated_at": now,
             "embedding": embedding_to_bytes(embedding),
-            "embedding_b64": embedding_to_base64(embedding),
+            CENTROID_FIELD: centroid_to_base64(embedding),
         },
     )
 
@@ -388,7 +583,5 @@ async def list_topics(
             data["id"] = topic_id
             topics.append(_convert_topic_types(data))
 
-    # Sort by signal_count descending
-    topics.sort(key=lambda x: x.get("signal_count") or 0, reverse=True)
-
-    return topics[:limit]
+    # Largest first; nlargest avoids sorting every topic to keep `limit`
+    return heapq.nlargest(limit, topics, key=lambda x: x.get("signal_count") or 0)
@@ -1,5 +1,6 @@
 """Deduplication logic using SHA256 hashing and Redis."""
 
+import heapq
 import logging
 import time
 from dataclasses import dataclass
@@ -15,6 +16,29 @@ logger = logging.getLogger(__name__)
 SIGNAL_PREFIX = "signal:"
 EMBED_QUEUE = "queue:to-embed"
 
+# Store-if-new in one round trip. A duplicate only gets its last_seen bumped;
+# a new signal is written and queued for embedding. Returns 1 for duplicates.
+# KEYS: signal key, embed queue. ARGV: signal hash, now, field/value pairs.
+STORE_SIGNAL_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], 'last_seen', ARGV[2])
+    return 1
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('RPUSH', KEYS[2], ARGV[1])
+return 0
+"""
+
+_store_signal_script = None
+
+
+def _get_store_signal_script(client: redis.Redis):
+    """Get the registered store-signal script (its SHA is cached after first use)."""
+    global _store_signal_script
+    if _store_signal_script is None:
+        _store_signal_script = client.register_script(STORE_SIGNAL_SCRIPT)
+    return _store_signal_script
+
 
 @dataclass
 class DedupeResult:
@@ -26,18 +50,16 @@ class DedupeResult:
     is_valid: bool
 
 
-async def check_and_store_signal(
-    client: redis.Redis,
-    signal: Signal,
-) -> DedupeResult:
-    """Check if signal is duplicate and store if new.
+def _prepare_signal(signal: Signal, now: int) -> tuple[DedupeResult, list, list]:
+    """Normalize and hash a signal and build its store-script call.
 
     Args:
-        client: Redis client.
-        signal: The signal to check and store.
+        signal: The signal to prepare.
+        now: Timestamp for first_seen/last_seen.
 
     Returns:
-        DedupeResult with deduplication status.
+        Tuple of (result assuming the signal is new, script keys, script
+        args). Keys and args are empty for invalid signals.
     """
     # Normalize the text
     normalized = normalize_text(signal.text)
@@ -45,59 +67,115 @@ async def check_and_store_signal(
     # Check validity
     if not is_valid_signal(normalized):
         logger.debug("Signal too short after normalization: %s", signal.id)
-        return DedupeResult(
+        result = DedupeResult(
             signal_hash="",
             is_duplicate=False,
             normalized_text=normalized,
             is_valid=False,
         )
+        return result, [], []
 
     # Compute hash
     signal_hash = compute_hash(normalized)
     key = f"{SIGNAL_PREFIX}{signal_hash}"
 
-    # Check if exists
-    exists = await client.exists(key)
-
-    if exists:
-        # Update last_seen timestamp
-        await client.hset(key, "last_seen", int(time.time()))
-        logger.debug("Duplicate signal found: %s", signal_hash[:16])
-        return DedupeResult(
-            signal_hash=signal_hash,
-            is_duplicate=True,
-            normalized_text=normalized,
-            is_valid=True,
-        )
-
-    # Store new signal
-    now = int(time.time())
-    await client.hset(
-        key,
-        mapping={
-            "text": signal.text,
-            "normalized": normalized,
-            "source": signal.source,
-            "url": signal.url,
-            "title": signal.title or "",
-            "author": signal.author or "",
-            "product": signal.product or "",
-            "first_seen": now,
-            "last_seen": now,
-            "topic_id": "",  # Will be set after clustering
-        },
-    )
-
-    # Push to embedding queue
-    await client.rpush(EMBED_QUEUE, signal_hash)
-    logger.info("New signal stored: %s, queued for embedding", signal_hash[:16])
-
-    return DedupeResult(
+    fields = {
+        "text": signal.text,
+        "normalized": normalized,
+        "source": signal.source,
+        "url": signal.url,
+        "title": signal.title or "",
+        "author": signal.author or "",
+        "product": signal.product or "",
+        "first_seen": now,
+        "last_seen": now,
+        "topic_id": "",  # Will be set after clustering
+    }
+    args = [signal_hash, now, *(item for pair in fields.items() for item in pair)]
+
+    result = DedupeResult(
         signal_hash=signal_hash,
         is_duplicate=False,
         normalized_text=normalized,
         is_valid=True,
     )
+    return result, [key, EMBED_QUEUE], args
+
+
+def _log_stored(result: DedupeResult) -> None:
+    """Log the outcome of storing a valid signal."""
+    if result.is_duplicate:
+        logger.debug("Duplicate signal found: %s", result.signal_hash[:16])
+    else:
+        logger.info("New signal stored: %s, queued for embedding", result.signal_hash[:16])
+
+
+async def check_and_store_signal(
+    client: redis.Redis,
+    signal: Signal,
+    now: int | None = None,
+) -> DedupeResult:
+    """Check if signal is duplicate and store if new.
+
+    Args:
+        client: Redis client.
+        signal: The signal to check and store.
+        now: Timestamp in seconds for first_seen/last_seen. Defaults to the
+            current time.
+
+    Returns:
+        DedupeResult with deduplication status.
+    """
+    if now is None:
+        now = time.time_ns() // 1_000_000_000
+    result, keys, args = _prepare_signal(signal, now)
+    if not result.is_valid:
+        return result
+
+    # Store it unless it already exists (then just bump last_seen)
+    is_duplicate = await _get_store_signal_script(client)(keys=keys, args=args, client=client)
+    result.is_duplicate = bool(is_duplicate)
+    _log_stored(result)
+    return result
+
+
+async def check_and_store_signals(
+    client: redis.Redis,
+    signals: list[Signal],
+    now: int | None = None,
+) -> list[DedupeResult]:
+    """Check and store a batch of signals in one Redis round trip.
+
+    Normalization and hashing happen locally; the store script for every
+    valid signal is then sent in a single pipeline. The scripts run in order,
+    so a repeat within the batch is reported as a duplicate.
+
+    Args:
+        client: Redis client.
+        signals: The signals to check and store.
+        now: Timestamp in seconds for first_seen/last_seen, shared by the
+            whole batch. Defaults to the current time.
+
+    Returns:
+        DedupeResult for each signal, in order.
+    """
+    if now is None:
+        now = time.time_ns() // 1_000_000_000
+    prepared = [_prepare_signal(signal, now) for signal in signals]
+    valid = [(result, keys, args) for result, keys, args in prepared if result.is_valid]
+
+    if valid:
+        script = _get_store_signal_script(client)
+        async with client.pipeline(transaction=False) as pipe:
+            for _, keys, args in valid:
+                await script(keys=keys, args=args, client=pipe)
+            flags = await pipe.execute()
+
+        for (result, _, _), is_duplicate in zip(valid, flags):
+            result.is_duplicate = bool(is_duplicate)
+            _log_stored(result)
+
+    return [result for result, _, _ in prepared]
 
 
 async def get_signal(client: redis.Redis, signal_hash: str) -> dict | None:
@@ -115,6 +193,23 @@ async def get_signal(client: redis.Redis, signal_hash: str) -> dict | None:
     return data if data else None
 
 
+async def get_signals(client: redis.Redis, signal_hashes: list[str]) -> list[dict | None]:
+    """Get several signals by hash in one round trip.
+
+    Args:
+        client: Redis client.
+        signal_hashes: The signal hashes.
+
+    Returns:
+        Signal data dict (or None if not found) for each hash, in order.
+    """
+    async with client.pipeline(transaction=False) as pipe:
+        for signal_hash in signal_hashes:
+            pipe.hgetall(f"{SIGNAL_PREFIX}{signal_hash}")
+        results = await pipe.execute()
+    return [data if data else None for data in results]
+
+
 async def update_signal_topic(
     client: redis.Redis,
     signal_hash: str,
@@ -144,6 +239,48 @@ async def pop_embed_queue(client: redis.Redis) -> str | None:
     return result
 
 
+async def blocking_pop_embed_queue(client: redis.Redis, timeout: float) -> str | None:
+    """Pop a signal hash from the embedding queue, waiting for one to arrive.
+
+    The BLPOP holds its connection for up to timeout seconds.
+
+    Args:
+        client: Redis client.
+        timeout: Seconds to wait for a hash.
+
+    Returns:
+        Signal hash or None if none arrived in time.
+    """
+    result = await client.blpop([EMBED_QUEUE], timeout=timeout)
+    return result[1] if result else None
+
+
+async def pop_embed_queue_batch(client: redis.Redis, count: int) -> list[str]:
+    """Pop up to count signal hashes from the embedding queue.
+
+    Args:
+        client: Redis client.
+        count: Maximum number of hashes to pop.
+
+    Returns:
+        Signal hashes in queue order (empty if the queue is empty).
+    """
+    result = await client.lpop(EMBED_QUEUE, count)
+    return result or []
+
+
+async def requeue_embed_queue(client: redis.Redis, signal_hashes: list[str]) -> None:
+    """Push popped signal hashes back onto the head of the embedding queue.
+
+    Args:
+        client: Redis client.
+        signal_hashes: Hashes in their original queue order.
+    """
+    if signal_hashes:
+        # LPUSH prepends one at a time, so push in reverse to keep the order
+        await client.lpush(EMBED_QUEUE, *reversed(signal_hashes))
+
+
 async def get_embed_queue_length(client: redis.Redis) -> int:
     """Get the length of the embedding queue.
 
@@ -199,7 +336,5 @@ async def list_signals(
             
             signals.append(signal)
     
-    # Sort by first_seen descending (newest first)
-    signals.sort(key=lambda x: x["first_seen"], reverse=True)
-    
-    return signals[:limit]
+    # Newest first; nlargest avoids sorting every signal to keep `limit`
+    return heapq.nlargest(limit, signals, key=lambda x: x["first_seen"])
@@ -1,7 +1,16 @@
 """Text normalization for deduplication."""
 
-import re
 import hashlib
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Hash used for signal dedupe: "sha256" (OpenSSL, SHA-NI accelerated where
+# available) or "blake3" (needs the blake3 package). Both give 64 hex chars;
+# signals stored under one algorithm won't dedupe against the other.
+HASH_ALGO = os.getenv("HASH_ALGO", "sha256")
 
 # Pattern to match URLs
 URL_PATTERN = re.compile(
@@ -9,11 +18,16 @@ URL_PATTERN = re.compile(
     r"|www\.[^\s<>\"{}|\\^`\[\]]+"
 )
 
-# Pattern to match most punctuation (keep apostrophes in contractions)
-PUNCTUATION_PATTERN = re.compile(r"[^\w\s']|(?<!\w)'|'(?!\w)")
+# Pattern to match runs of punctuation other than apostrophes
+NON_WORD_PATTERN = re.compile(r"[^\w\s']+")
+
+# Pattern to match runs of apostrophes (never part of a contraction)
+APOSTROPHE_RUN_PATTERN = re.compile(r"''+")
 
-# Pattern to collapse multiple whitespace
-WHITESPACE_PATTERN = re.compile(r"\s+")
+# bytes.translate table blanking the ASCII bytes NON_WORD_PATTERN matches
+_ASCII_PUNCTUATION_TABLE = bytes(
+    0x20 if NON_WORD_PATTERN.match(chr(i)) else i for i in range(128)
+) + bytes(range(128, 256))
 
 
 def normalize_text(text: str) -> str:
@@ -26,6 +40,10 @@ def normalize_text(text: str) -> str:
     4. Collapse multiple whitespace to single space
     5. Strip leading/trailing whitespace
 
+    ASCII text without URLs needs no regex scan at all: punctuation is
+    blanked with a byte translation table, whitespace is collapsed with
+    split/join and apostrophes are only examined in the words containing them.
+
     Args:
         text: The raw text to normalize.
 
@@ -35,29 +53,58 @@ def normalize_text(text: str) -> str:
     # Lowercase
     result = text.lower()
 
-    # Strip URLs
-    result = URL_PATTERN.sub(" ", result)
+    # Strip URLs (every URL_PATTERN match contains one of these)
+    if "http" in result or "www." in result:
+        result = URL_PATTERN.sub(" ", result)
+
+    # Remove punctuation (ASCII text, the common case, skips the regex)
+    if result.isascii():
+        result = result.encode("ascii").translate(_ASCII_PUNCTUATION_TABLE).decode("ascii")
+    else:
+        result = NON_WORD_PATTERN.sub(" ", result)
+
+    # Collapse and strip whitespace
+    if "'" not in result:
+        return " ".join(result.split())
+
+    # Words now only hold word characters and apostrophes, so an apostrophe
+    # is part of a contraction unless it is at an edge or next to another
+    words = []
+    for word in result.split():
+        if "'" in word:
+            words.extend(part for part in APOSTROPHE_RUN_PATTERN.split(word.strip("'")) if part)
+        else:
+            words.append(word)
+    return " ".join(words)
+
+
+def _get_hash_function():
+    """Resolve the HASH_ALGO constructor once at import."""
+    if HASH_ALGO == "blake3":
+        try:
+            from blake3 import blake3
 
-    # Remove punctuation
-    result = PUNCTUATION_PATTERN.sub(" ", result)
+            return blake3
+        except ImportError:
+            logger.warning("HASH_ALGO=blake3 but blake3 is not installed, using sha256")
+    elif HASH_ALGO != "sha256":
+        logger.warning("Unknown HASH_ALGO %r, using sha256", HASH_ALGO)
+    return hashlib.sha256
 
-    # Collapse whitespace
-    result = WHITESPACE_PATTERN.sub(" ", result)
 
-    # Strip
-    return result.strip()
+_hash_function = _get_hash_function()
 
 
 def compute_hash(text: str) -> str:
-    """Compute SHA256 hash of text.
+    """Compute the dedupe hash of text (SHA256 unless HASH_ALGO says otherwise).
 
     Args:
         text: The text to hash (should be normalized first).
 
     Returns:
-        Hex-encoded SHA256 hash.
+        Hex-encoded 256-bit hash.
     """
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return _hash_function(text.encode("utf-8")).hexdigest()
 
 
 def is_valid_signal(normalized_text: str, min_length: int = 10) -> bool:
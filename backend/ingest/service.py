@@ -1,15 +1,24 @@
 """Ingest service orchestrating the pipeline."""
 
+import asyncio
 import logging
+import os
+import time
 from dataclasses import dataclass
 
 import redis.asyncio as redis
 
-from ingest.dedupe import DedupeResult, check_and_store_signal
+from ingest.dedupe import DedupeResult, check_and_store_signal, check_and_store_signals
 from models import Signal
 
 logger = logging.getLogger(__name__)
 
+# Signals per Redis pipeline in ingest_batch
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "500"))
+
+# Maximum pipelines in flight at once for a large batch
+INGEST_MAX_CONCURRENT_CHUNKS = int(os.getenv("INGEST_MAX_CONCURRENT_CHUNKS", "8"))
+
 
 @dataclass
 class IngestResult:
@@ -59,7 +68,11 @@ class IngestService:
             IngestResult with the status.
         """
         result: DedupeResult = await check_and_store_signal(self.redis, signal)
+        return self._to_ingest_result(signal, result)
 
+    @staticmethod
+    def _to_ingest_result(signal: Signal, result: DedupeResult) -> IngestResult:
+        """Convert a dedupe result into an IngestResult."""
         if not result.is_valid:
             return IngestResult(
                 signal_id=signal.id,
@@ -83,21 +96,38 @@ class IngestService:
     async def ingest_batch(self, signals: list[Signal]) -> BatchIngestResult:
         """Ingest a batch of signals.
 
+        Each chunk of INGEST_CHUNK_SIZE signals is deduplicated and stored
+        in one Redis round trip; the chunks of a large batch are sent
+        concurrently (at most INGEST_MAX_CONCURRENT_CHUNKS at a time).
+
         Args:
             signals: List of signals to ingest.
 
         Returns:
             BatchIngestResult with aggregated stats.
         """
-        results = []
+        semaphore = asyncio.Semaphore(INGEST_MAX_CONCURRENT_CHUNKS)
+        # One timestamp for the whole batch, so every chunk agrees on first_seen
+        now = time.time_ns() // 1_000_000_000
+
+        async def store_chunk(chunk: list[Signal]) -> list[DedupeResult]:
+            async with semaphore:
+                return await check_and_store_signals(self.redis, chunk, now)
+
+        chunk_results = await asyncio.gather(*(
+            store_chunk(signals[i:i + INGEST_CHUNK_SIZE])
+            for i in range(0, len(signals), INGEST_CHUNK_SIZE)
+        ))
+        dedupe_results = [result for chunk in chunk_results for result in chunk]
+        results = [
+            self._to_ingest_result(signal, dedupe_result)
+            for signal, dedupe_result in zip(signals, dedupe_results)
+        ]
+
         queued = 0
         duplicates = 0
         invalid = 0
-
-        for signal in signals:
-            result = await self.ingest_signal(signal)
-            results.append(result)
-
+        for result in results:
             if result.status == "queued":
                 queued += 1
             elif result.status == "duplicate":
@@ -3,15 +3,20 @@
 from learning.similar_fixes import get_similar_successful_fixes, format_similar_fixes
 from learning.rules import (
     create_rule,
+    create_rules,
     get_rule,
     delete_rule,
     get_top_rules_for_product,
+    get_rendered_top_rules,
     list_all_rules_for_product,
     increment_rule_usage,
+    flush_rule_usage,
     format_rules_for_prompt,
+    backfill_rule_indexes,
     RULE_CATEGORIES,
 )
 from learning.rule_extractor import extract_rules_from_feedback
+from learning.context import get_fix_context
 
 __all__ = [
     # Similar fixes
@@ -19,13 +24,19 @@ __all__ = [
     "format_similar_fixes",
     # Rules
     "create_rule",
+    "create_rules",
     "get_rule",
     "delete_rule",
     "get_top_rules_for_product",
+    "get_rendered_top_rules",
     "list_all_rules_for_product",
     "increment_rule_usage",
+    "flush_rule_usage",
     "format_rules_for_prompt",
+    "backfill_rule_indexes",
     "extract_rules_from_feedback",
     "RULE_CATEGORIES",
+    # Agent context
+    "get_fix_context",
 ]
 
@@ -0,0 +1,73 @@
+"""Assemble the learned context passed to the fix agent."""
+
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+
+from learning.rules import get_rendered_top_rules, increment_rule_usage
+from learning.similar_fixes import format_similar_fixes, get_similar_successful_fixes
+
+logger = logging.getLogger(__name__)
+
+
+async def _get_style_rules_text(
+    redis_client: Redis,
+    product: str,
+    limit: int,
+) -> str:
+    """Fetch and format the top style rules, recording their usage."""
+    try:
+        rules_text, rule_ids = await get_rendered_top_rules(redis_client, product, limit=limit)
+    except Exception as e:
+        logger.warning("Failed to get style rules for product %s: %s", product, e)
+        return ""
+
+    if rule_ids:
+        logger.info("Found %d style rules for product %s", len(rule_ids), product)
+        # Increment usage counters for each rule
+        try:
+            await asyncio.gather(*(
+                increment_rule_usage(redis_client, product, rule_id)
+                for rule_id in rule_ids
+            ))
+        except Exception as e:
+            logger.warning("Failed to record rule usage for product %s: %s", product, e)
+
+    return rules_text
+
+
+async def get_fix_context(
+    redis_client: Redis,
+    task: dict,
+    product: str | None,
+    rules_limit: int = 10,
+) -> tuple[str, str]:
+    """Fetch similar successful fixes and style rules for a task concurrently.
+
+    Never raises, so it can run alongside the repo clone: lookup failures
+    are logged and the agent runs without that context.
+
+    Args:
+        redis_client: Redis client.
+        task: The task dict with category, title, summary.
+        product: Product name to fetch style rules for.
+        rules_limit: Maximum number of style rules to include.
+
+    Returns:
+        Tuple of (similar_fixes_text, style_rules_text) for run_fix_agent.
+    """
+
+    async def similar_fixes_text() -> str:
+        similar_fixes = await get_similar_successful_fixes(task, redis_client)
+        if similar_fixes:
+            logger.info("Found %d similar successful fixes to learn from", len(similar_fixes))
+        return format_similar_fixes(similar_fixes)
+
+    async def style_rules_text() -> str:
+        if not product:
+            return ""
+        return await _get_style_rules_text(redis_client, product, rules_limit)
+
+    fixes_text, rules_text = await asyncio.gather(similar_fixes_text(), style_rules_text())
+    return fixes_text, rules_text
@@ -1,8 +1,12 @@
 """Style rules storage and retrieval for self-improvement."""
 
+import asyncio
+import base64
+import json
 import logging
+import os
 import time
-import uuid
+from collections import OrderedDict
 
 from redis.asyncio import Redis
 
@@ -11,6 +15,203 @@ logger = logging.getLogger(__name__)
 # Valid rule categories
 RULE_CATEGORIES = {"style", "convention", "workflow", "constraint"}
 
+# Redis key prefixes: rule hashes and the per-product ZSET of rule IDs
+# ranked by usage then recency
+RULE_PREFIX = "rule:"
+RULE_TOP_PREFIX = "rules:top:"
+RULE_ID_COUNTER_PREFIX = "rules:id:"
+# Per-product counter bumped whenever rules are created or deleted; rendered
+# prompt sections record the generation they were built from
+RULE_GENERATION_PREFIX = "rules:gen:"
+
+# Seconds a rendered top-rules prompt section is reused; usage counts shown
+# in the prompt may lag by up to this long (0 disables the cache)
+RENDERED_RULES_TTL = int(os.getenv("RENDERED_RULES_TTL", "30"))
+
+# Leaderboard score = times_applied * RULE_USAGE_WEIGHT + created_at, so one
+# double orders by usage and breaks ties by recency (exact below 2**53)
+RULE_USAGE_WEIGHT = 10_000_000_000
+
+# Rule usage is written behind: increments are coalesced in memory and
+# flushed every RULE_USAGE_FLUSH_INTERVAL seconds, or sooner once
+# RULE_USAGE_MAX_PENDING rules have pending increments
+RULE_USAGE_FLUSH_INTERVAL = float(os.getenv("RULE_USAGE_FLUSH_INTERVAL", "0.25"))
+RULE_USAGE_MAX_PENDING = int(os.getenv("RULE_USAGE_MAX_PENDING", "100"))
+
+# Apply coalesced usage to a rule unless it was deleted meanwhile (HINCRBY
+# alone would recreate a partial hash).
+# KEYS: rule hash, leaderboard ZSET. ARGV: delta, last_applied_at, score
+# delta, rule ID.
+APPLY_RULE_USAGE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], 'times_applied', ARGV[1])
+redis.call('HSET', KEYS[1], 'last_applied_at', ARGV[2])
+redis.call('ZINCRBY', KEYS[2], ARGV[3], ARGV[4])
+return 1
+"""
+
+# Keys requested per SCAN call when backfilling the rule indexes
+SCAN_COUNT = 500
+
+# Rule hashes fetched per pipeline when listing rules
+RULE_FETCH_CHUNK_SIZE = 500
+
+# Parsed rules kept in-process, keyed by rule key and versioned by their
+# leaderboard score (which changes whenever usage does)
+PARSED_RULE_CACHE_SIZE = 4096
+
+_parsed_rules: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+
+def _rule_key(product: str, rule_id: str) -> str:
+    """Build the hash key for a rule."""
+    return f"{RULE_PREFIX}{product}:{rule_id}"
+
+
+def _encode_rule_id(n: int) -> str:
+    """Encode a rule counter value as an 8-character lowercase base32 ID.
+
+    IDs are fixed-width, so they sort in creation order.
+    """
+    return base64.b32encode(n.to_bytes(5, "big")).decode("ascii").lower()
+
+
+def _rule_top_key(product: str) -> str:
+    """Build the key of a product's rule leaderboard ZSET."""
+    return f"{RULE_TOP_PREFIX}{product}"
+
+
+def _rendered_rules_key(product: str) -> str:
+    """Build the key of a product's rendered top-rules cache (hash by limit)."""
+    return f"{RULE_TOP_PREFIX}{product}:rendered"
+
+
+def _rule_generation_key(product: str) -> str:
+    """Build the key of a product's rule set generation counter."""
+    return f"{RULE_GENERATION_PREFIX}{product}"
+
+
+def _rule_score(times_applied: int, created_at: int) -> int:
+    """Compute a rule's leaderboard score."""
+    return times_applied * RULE_USAGE_WEIGHT + created_at
+
+
+def _parse_rule(data: dict) -> dict:
+    """Convert a rule hash's numeric fields.
+
+    The Redis client uses decode_responses=True, so fields are already str.
+    """
+    data["times_applied"] = int(data.get("times_applied", 0))
+    data["created_at"] = int(data.get("created_at", 0))
+    data["last_applied_at"] = int(data.get("last_applied_at", 0))
+    return data
+
+
+async def _fetch_rules(
+    redis_client: Redis,
+    product: str,
+    scored_ids: list[tuple[str, float]],
+) -> list[dict]:
+    """Fetch rules, reusing parsed rules whose leaderboard score is unchanged.
+
+    Rules aren't edited after creation and every usage update moves the
+    score, so a matching score means the cached rule is current. Only the
+    rest are fetched, with pipelined HGETALLs (RULE_FETCH_CHUNK_SIZE per
+    round trip).
+
+    Args:
+        redis_client: Redis client.
+        product: Product name.
+        scored_ids: (rule_id, leaderboard score) pairs from the ZSET.
+
+    Returns:
+        Rule dicts in the order of scored_ids, skipping missing rules.
+    """
+    rules: list[dict | None] = []
+    misses = []
+    for rule_id, score in scored_ids:
+        key = _rule_key(product, rule_id)
+        cached = _parsed_rules.get(key)
+        if cached is not None and cached[0] == score:
+            _parsed_rules.move_to_end(key)
+            rules.append(dict(cached[1]))
+        else:
+            misses.append((len(rules), key, score))
+            rules.append(None)
+
+    if misses:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for i in range(0, len(misses), RULE_FETCH_CHUNK_SIZE):
+                chunk = misses[i:i + RULE_FETCH_CHUNK_SIZE]
+                for _, key, _ in chunk:
+                    pipe.hgetall(key)
+                for (index, key, score), data in zip(chunk, await pipe.execute()):
+                    if not data:
+                        continue
+                    rule = _parse_rule(data)
+                    _parsed_rules[key] = (score, rule)
+                    rules[index] = dict(rule)
+        while len(_parsed_rules) > PARSED_RULE_CACHE_SIZE:
+            _parsed_rules.popitem(last=False)
+
+    return [rule for rule in rules if rule is not None]
+
+
+async def backfill_rule_indexes(redis_client: Redis) -> int:
+    """Add rules stored before the per-product index existed to their index.
+
+    Scans the keyspace once and rebuilds each rule's leaderboard score
+    from its hash; safe to run repeatedly.
+
+    Args:
+        redis_client: Redis client.
+
+    Returns:
+        Number of rule keys found.
+    """
+    found = 0
+    keys = []
+    async for key in redis_client.scan_iter(match=f"{RULE_PREFIX}*", count=SCAN_COUNT):
+        keys.append(key)
+        if len(keys) >= SCAN_COUNT:
+            found += await _index_rule_keys(redis_client, keys)
+            keys = []
+    if keys:
+        found += await _index_rule_keys(redis_client, keys)
+
+    if found:
+        logger.info("Indexed %d existing rules", found)
+    return found
+
+
+async def _index_rule_keys(redis_client: Redis, keys: list[str]) -> int:
+    """Add a chunk of rule keys to their product's leaderboard.
+
+    Args:
+        redis_client: Redis client.
+        keys: Rule hash keys.
+
+    Returns:
+        Number of rules indexed.
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.hmget(key, "times_applied", "created_at")
+        counters = await pipe.execute()
+
+        indexed = 0
+        for key, (times_applied, created_at) in zip(keys, counters):
+            product, _, rule_id = key[len(RULE_PREFIX):].rpartition(":")
+            if not product:
+                continue
+            score = _rule_score(int(times_applied or 0), int(created_at or 0))
+            pipe.zadd(_rule_top_key(product), {rule_id: score})
+            indexed += 1
+        await pipe.execute()
+    return indexed
+
 
 async def create_rule(
     redis_client: Redis,
@@ -35,33 +236,85 @@ async def create_rule(
     Returns:
         The rule ID.
     """
-    if category not in RULE_CATEGORIES:
-        raise ValueError(f"Invalid category: {category}. Must be one of {RULE_CATEGORIES}")
+    rule_ids = await create_rules(
+        redis_client,
+        product,
+        [{"content": content, "category": category}],
+        source=source,
+        source_task_id=source_task_id,
+        reviewer=reviewer,
+    )
+    return rule_ids[0]
+
+
+async def create_rules(
+    redis_client: Redis,
+    product: str,
+    rules: list[dict],
+    source: str = "manual",
+    source_task_id: str | None = None,
+    reviewer: str | None = None,
+) -> list[str]:
+    """Create several style rules for a product in two round trips.
     
-    rule_id = str(uuid.uuid4())[:8]
-    key = f"rule:{product}:{rule_id}"
-    now = int(time.time())
+    IDs for the whole batch are reserved with one INCRBY, then every rule's
+    hash and index entries are written in a single MULTI.
     
-    rule_data = {
-        "id": rule_id,
-        "product": product,
-        "content": content,
-        "category": category,
-        "source": source,
-        "created_at": now,
-        "times_applied": 0,
-        "last_applied_at": 0,
-    }
+    Args:
+        redis_client: Redis client.
+        product: Product name (e.g., "joplin").
+        rules: Dicts with "content" and "category" (one of: style,
+            convention, workflow, constraint).
+        source: Either "review_feedback" or "manual".
+        source_task_id: Task ID if from review feedback.
+        reviewer: Reviewer username if from review feedback.
+        
+    Returns:
+        The rule IDs, in the order of rules.
+
+    Raises:
+        ValueError: If any rule has an invalid category (nothing is stored).
+    """
+    for rule in rules:
+        if rule["category"] not in RULE_CATEGORIES:
+            raise ValueError(
+                f"Invalid category: {rule['category']}. Must be one of {RULE_CATEGORIES}"
+            )
+    if not rules:
+        return []
     
-    if source_task_id:
-        rule_data["source_task_id"] = source_task_id
-    if reviewer:
-        rule_data["reviewer"] = reviewer
+    # Per-product counter: unique, short and ordered, unlike a uuid4 prefix
+    last = await redis_client.incrby(f"{RULE_ID_COUNTER_PREFIX}{product}", len(rules))
+    rule_ids = [_encode_rule_id(n) for n in range(last - len(rules) + 1, last + 1)]
+    now = int(time.time())
     
-    await redis_client.hset(key, mapping=rule_data)
+    async with redis_client.pipeline() as pipe:
+        for rule_id, rule in zip(rule_ids, rules):
+            rule_data = {
+                "id": rule_id,
+                "product": product,
+                "content": rule["content"],
+                "category": rule["category"],
+                "source": source,
+                "created_at": now,
+                "times_applied": 0,
+                "last_applied_at": 0,
+            }
+            
+            if source_task_id:
+                rule_data["source_task_id"] = source_task_id
+            if reviewer:
+                rule_data["reviewer"] = reviewer
+            
+            pipe.hset(_rule_key(product, rule_id), mapping=rule_data)
+            pipe.zadd(_rule_top_key(product), {rule_id: _rule_score(0, now)})
+        pipe.incr(_rule_generation_key(product))
+        pipe.delete(_rendered_rules_key(product))
+        await pipe.execute()
     
-    logger.info("Created rule %s for product %s: %s", rule_id, product, content[:50])
-    return rule_id
+    for rule_id, rule in zip(rule_ids, rules):
+        logger.info("Created rule %s for product %s: %s", rule_id, product, rule["content"][:50])
+    return rule_ids
 
 
 async def get_rule(
@@ -79,17 +332,9 @@ async def get_rule(
     Returns:
         Rule dict or None if not found.
     """
-    key = f"rule:{product}:{rule_id}"
-    data = await redis_client.hgetall(key)
-    
-    if not data:
-        return None
-    
-    return {
-        k.decode() if isinstance(k, bytes) else k: 
-        v.decode() if isinstance(v, bytes) else v 
-        for k, v in data.items()
-    }
+    # decode_responses=True: the hash is already a dict of str
+    data = await redis_client.hgetall(_rule_key(product, rule_id))
+    return data or None
 
 
 async def delete_rule(
@@ -107,8 +352,12 @@ async def delete_rule(
     Returns:
         True if deleted, False if not found.
     """
-    key = f"rule:{product}:{rule_id}"
-    deleted = await redis_client.delete(key)
+    async with redis_client.pipeline() as pipe:
+        pipe.delete(_rule_key(product, rule_id))
+        pipe.zrem(_rule_top_key(product), rule_id)
+        pipe.incr(_rule_generation_key(product))
+        pipe.delete(_rendered_rules_key(product))
+        deleted, *_ = await pipe.execute()
     
     if deleted:
         logger.info("Deleted rule %s for product %s", rule_id, product)
@@ -123,7 +372,9 @@ async def get_top_rules_for_product(
 ) -> list[dict]:
     """Get the top rules for a product, sorted by usage and recency.
     
-    Rules are sorted by: times_applied DESC, created_at DESC
+    Rules are sorted by: times_applied DESC, created_at DESC. The order
+    comes from the product's leaderboard ZSET, so only the top rules are
+    fetched.
     
     Args:
         redis_client: Redis client.
@@ -133,32 +384,62 @@ async def get_top_rules_for_product(
     Returns:
         List of rule dicts.
     """
-    # Get all rule keys for this product
-    pattern = f"rule:{product}:*"
-    keys = await redis_client.keys(pattern)
-    
-    if not keys:
+    if limit <= 0:
         return []
-    
-    rules = []
-    for key in keys:
-        data = await redis_client.hgetall(key)
-        if data:
-            rule = {
-                k.decode() if isinstance(k, bytes) else k: 
-                v.decode() if isinstance(v, bytes) else v 
-                for k, v in data.items()
-            }
-            # Convert numeric fields
-            rule["times_applied"] = int(rule.get("times_applied", 0))
-            rule["created_at"] = int(rule.get("created_at", 0))
-            rule["last_applied_at"] = int(rule.get("last_applied_at", 0))
-            rules.append(rule)
-    
-    # Sort by times_applied DESC, then created_at DESC
-    rules.sort(key=lambda r: (r["times_applied"], r["created_at"]), reverse=True)
-    
-    return rules[:limit]
+    scored_ids = await redis_client.zrevrange(
+        _rule_top_key(product), 0, limit - 1, withscores=True
+    )
+    return await _fetch_rules(redis_client, product, scored_ids)
+
+
+async def get_rendered_top_rules(
+    redis_client: Redis,
+    product: str,
+    limit: int = 10,
+    ttl: int = RENDERED_RULES_TTL,
+) -> tuple[str, list[str]]:
+    """Get the top rules for a product formatted for the agent prompt.
+
+    The rendered text is cached for ttl seconds, so repeated prompts cost a
+    single round trip. Each entry records the rule set generation it was
+    rendered from and is ignored once creating or deleting a rule has bumped
+    it, so a render that raced a change can't serve the old rules; usage
+    counts are left to the TTL.
+
+    Args:
+        redis_client: Redis client.
+        product: Product name.
+        limit: Maximum number of rules to include.
+        ttl: Seconds to cache the rendered text.
+
+    Returns:
+        Tuple of (formatted rules text, IDs of the included rules).
+    """
+    cache_key = _rendered_rules_key(product)
+    generation = None
+    if ttl > 0:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(_rule_generation_key(product))
+            pipe.hget(cache_key, str(limit))
+            generation, cached = await pipe.execute()
+        generation = generation or "0"
+        if cached:
+            entry = json.loads(cached)
+            if entry.get("generation") == generation:
+                return entry["text"], entry["ids"]
+
+    rules = await get_top_rules_for_product(redis_client, product, limit=limit)
+    text = format_rules_for_prompt(rules)
+    rule_ids = [rule.get("id", "") for rule in rules]
+
+    if ttl > 0:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            entry = {"generation": generation, "text": text, "ids": rule_ids}
+            pipe.hset(cache_key, str(limit), json.dumps(entry))
+            pipe.expire(cache_key, ttl, nx=True)
+            await pipe.execute()
+
+    return text, rule_ids
 
 
 async def list_all_rules_for_product(
@@ -174,25 +455,9 @@ async def list_all_rules_for_product(
     Returns:
         List of all rule dicts, sorted by created_at DESC.
     """
-    pattern = f"rule:{product}:*"
-    keys = await redis_client.keys(pattern)
-    
-    if not keys:
-        return []
-    
-    rules = []
-    for key in keys:
-        data = await redis_client.hgetall(key)
-        if data:
-            rule = {
-                k.decode() if isinstance(k, bytes) else k: 
-                v.decode() if isinstance(v, bytes) else v 
-                for k, v in data.items()
-            }
-            rule["times_applied"] = int(rule.get("times_applied", 0))
-            rule["created_at"] = int(rule.get("created_at", 0))
-            rule["last_applied_at"] = int(rule.get("last_applied_at", 0))
-            rules.append(rule)
+    # Every rule is on the leaderboard; its scores version the parsed cache
+    scored_ids = await redis_client.zrange(_rule_top_key(product), 0, -1, withscores=True)
+    rules = await _fetch_rules(redis_client, product, scored_ids)
     
     # Sort by created_at DESC (newest first)
     rules.sort(key=lambda r: r["created_at"], reverse=True)
@@ -200,6 +465,122 @@ async def list_all_rules_for_product(
     return rules
 
 
+class RuleUsageBuffer:
+    """Coalesces rule usage increments and writes them in batches.
+
+    Recording a use is an in-memory update; a background task flushes all
+    pending increments in one pipeline, so prompt assembly never waits on
+    Redis for usage bookkeeping.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        flush_interval: float = RULE_USAGE_FLUSH_INTERVAL,
+        max_pending: int = RULE_USAGE_MAX_PENDING,
+    ):
+        """Initialize the buffer.
+
+        Args:
+            redis_client: Redis client.
+            flush_interval: Seconds between flushes.
+            max_pending: Pending rules that trigger an early flush.
+        """
+        self.redis = redis_client
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # (product, rule_id) -> (uses, latest use timestamp)
+        self._pending: dict[tuple[str, str], tuple[int, int]] = {}
+        self._script = redis_client.register_script(APPLY_RULE_USAGE_SCRIPT)
+        self._flush_now = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def record(self, product: str, rule_id: str, applied_at: int) -> None:
+        """Record one use of a rule.
+
+        Args:
+            product: Product name.
+            rule_id: Rule ID.
+            applied_at: Timestamp of the use.
+        """
+        uses, _ = self._pending.get((product, rule_id), (0, 0))
+        self._pending[(product, rule_id)] = (uses + 1, applied_at)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= self.max_pending:
+            self._flush_now.set()
+
+    async def _run(self) -> None:
+        """Flush pending usage periodically until cancelled."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("Failed to flush rule usage: %s", e)
+
+    async def flush(self) -> None:
+        """Write all pending usage to Redis in one pipeline.
+
+        On failure the increments are kept for the next flush.
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for (product, rule_id), (uses, applied_at) in pending.items():
+                    await self._script(
+                        keys=[_rule_key(product, rule_id), _rule_top_key(product)],
+                        args=[uses, applied_at, uses * RULE_USAGE_WEIGHT, rule_id],
+                        client=pipe,
+                    )
+                await pipe.execute()
+        except Exception:
+            for item, (uses, applied_at) in pending.items():
+                newer_uses, newer_applied_at = self._pending.get(item, (0, 0))
+                self._pending[item] = (uses + newer_uses, max(applied_at, newer_applied_at))
+            raise
+
+    async def close(self) -> None:
+        """Stop the flush task and write any remaining usage."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+_usage_buffer: RuleUsageBuffer | None = None
+
+
+async def _get_usage_buffer(redis_client: Redis) -> RuleUsageBuffer:
+    """Get the usage buffer for a Redis client, creating it on first use.
+
+    A buffer for a previous client is flushed before it is replaced, so
+    its pending increments aren't lost.
+    """
+    global _usage_buffer
+    if _usage_buffer is not None and _usage_buffer.redis is not redis_client:
+        previous, _usage_buffer = _usage_buffer, None
+        try:
+            await previous.close()
+        except Exception as e:
+            logger.warning("Failed to flush rule usage for previous client: %s", e)
+    if _usage_buffer is None:
+        _usage_buffer = RuleUsageBuffer(redis_client)
+    return _usage_buffer
+
+
 async def increment_rule_usage(
     redis_client: Redis,
     product: str,
@@ -207,18 +588,33 @@ async def increment_rule_usage(
 ) -> None:
     """Increment the usage counter for a rule.
     
-    Called when a rule is included in an agent prompt.
+    Called when a rule is included in an agent prompt. The increment is
+    buffered and written to Redis within RULE_USAGE_FLUSH_INTERVAL seconds.
     
     Args:
         redis_client: Redis client.
         product: Product name.
         rule_id: Rule ID.
     """
-    key = f"rule:{product}:{rule_id}"
-    now = int(time.time())
-    
-    await redis_client.hincrby(key, "times_applied", 1)
-    await redis_client.hset(key, "last_applied_at", now)
+    buffer = await _get_usage_buffer(redis_client)
+    buffer.record(product, rule_id, int(time.time()))
+
+
+async def flush_rule_usage() -> None:
+    """Write buffered rule usage and stop the flush task (call on shutdown)."""
+    global _usage_buffer
+    if _usage_buffer is not None:
+        await _usage_buffer.close()
+        _usage_buffer = None
+
+
+# Usage note for rules that haven't been applied yet
+NEW_RULE_NOTE = "[new]"
+
+
+def _usage_note(times_applied: int) -> str:
+    """Format the usage note shown after a rule in the prompt."""
+    return f"[applied {times_applied}x]" if times_applied > 0 else NEW_RULE_NOTE
 
 
 def format_rules_for_prompt(rules: list[dict]) -> str:
@@ -233,15 +629,10 @@ def format_rules_for_prompt(rules: list[dict]) -> str:
     if not rules:
         return "No style rules learned yet for this product."
     
-    lines = []
-    for i, rule in enumerate(rules, 1):
-        content = rule.get("content", "")
-        category = rule.get("category", "general")
-        times_applied = rule.get("times_applied", 0)
-        
-        # Format: "1. Use early returns (style) [applied 3x]"
-        usage_note = f"[applied {times_applied}x]" if times_applied > 0 else "[new]"
-        lines.append(f"{i}. {content} ({category}) {usage_note}")
-    
-    return "\n".join(lines)
+    # Format: "1. Use early returns (style) [applied 3x]"
+    return "\n".join(
+        f"{i}. {rule.get('content', '')} ({rule.get('category', 'general')}) "
+        f"{_usage_note(rule.get('times_applied', 0))}"
+        for i, rule in enumerate(rules, 1)
+    )
 
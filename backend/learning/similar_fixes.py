@@ -43,7 +43,7 @@ async def get_similar_successful_fixes(
         # Embed the current task
         embedder = get_embedder()
         text = f"{task.get('category', '')}: {task.get('title', '')}. {task.get('summary', '')}"
-        query_embedding = embedder.embed(text)
+        query_embedding = await embedder.embed_np(text)
         
         # Convert to bytes for search
         query_bytes = embedding_to_bytes(query_embedding)
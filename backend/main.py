@@ -31,7 +31,7 @@ from ingest.cluster import get_topic, list_topics
 from ingest.service import BatchIngestResult, IngestService
 from ingest.dedupe import list_signals
 from models import Signal, ScrapeConfig
-from agent import run_fix_agent, clone_repo, create_branch, commit_and_push, create_pr, cleanup_repo
+from agent import run_fix_agent, prewarm_fix_agent, release_agent_sessions, clone_repo_async, create_branch, commit_and_push_async, create_pr, cleanup_repo
 from tasks import get_task, list_tasks, update_task_status, update_task_github_issue, update_task_fix
 from redis_setup import (
     close_redis,
@@ -43,15 +43,13 @@ from scrapers import RedditScraper, WebScraper
 from workers import ClassifyWorker, EmbedWorker
 from webhooks import verify_signature, handle_pr_event, handle_review_event
 from learning import (
-    get_similar_successful_fixes, 
-    format_similar_fixes,
-    get_top_rules_for_product,
+    get_fix_context,
     list_all_rules_for_product,
-    increment_rule_usage,
-    format_rules_for_prompt,
     create_rule,
     get_rule,
     delete_rule,
+    backfill_rule_indexes,
+    flush_rule_usage,
     RULE_CATEGORIES,
 )
 
@@ -68,7 +66,7 @@ async def lifespan(_: FastAPI):
     # Startup
     logger.info("Starting up...")
 
-    # Initialize Weave for observability (before any @weave.op decorated functions)
+    # Initialize Weave for observability (before any traced agent runs)
     from agent.fix_agent import init_weave
     if init_weave():
         logger.info("Weave observability enabled")
@@ -77,6 +75,9 @@ async def lifespan(_: FastAPI):
     redis_client = await init_redis()
     logger.info("Redis initialized")
 
+    # Add rules stored before the per-product rule index existed
+    await backfill_rule_indexes(redis_client)
+
     # Start embed worker
     _embed_worker = EmbedWorker(redis_client)
     _embed_worker.start()
@@ -100,6 +101,12 @@ async def lifespan(_: FastAPI):
         await _embed_worker.stop()
         logger.info("Embed worker stopped")
 
+    from agent.fix_agent import shutdown_agent_pool
+    from agent.repo import close_http_clients
+    await shutdown_agent_pool()
+    await close_http_clients()
+    await flush_rule_usage()
+
     await close_redis()
     logger.info("Redis connection closed")
 
@@ -531,7 +538,8 @@ async def create_issue_for_task(task_id: str) -> dict:
         body = format_issue_body(task_data, topic_id)
         labels = get_labels_for_task(task_data)
 
-        issue = await github_client.create_issue(repo, title, body, labels)
+        async with github_client:
+            issue = await github_client.create_issue(repo, title, body, labels)
 
         # Update task with issue info
         await update_task_github_issue(
@@ -600,9 +608,12 @@ async def fix_task(task_id: str) -> dict:
         # Update status to running
         await update_task_fix(redis_client, task_id, "running")
 
-        # Clone repository (run in thread pool to avoid blocking)
+        # Clone repository while fetching learned context (independent I/O)
         logger.info("Cloning repo %s for task %s", repo, task_id)
-        clone_result = await asyncio.to_thread(clone_repo, repo, task_id=task_id)
+        clone_result, (similar_fixes_text, style_rules_text) = await asyncio.gather(
+            clone_repo_async(repo, task_id=task_id),
+            get_fix_context(redis_client, task_data, product),
+        )
 
         if not clone_result.success:
             await update_task_fix(redis_client, task_id, "failed")
@@ -615,31 +626,15 @@ async def fix_task(task_id: str) -> dict:
         branch_name = f"darwin/fix-{task_id}"
 
         try:
-            # Create fix branch (run in thread pool to avoid blocking)
-            branch_created = await asyncio.to_thread(create_branch, repo_path, branch_name)
+            # Create fix branch (in a worker thread) while the agent session starts
+            branch_created, _ = await asyncio.gather(
+                asyncio.to_thread(create_branch, repo_path, branch_name),
+                prewarm_fix_agent(repo_path),
+            )
             if not branch_created:
                 await update_task_fix(redis_client, task_id, "failed")
                 raise HTTPException(status_code=500, detail="Failed to create branch")
 
-            # Get similar successful fixes for self-improvement
-            similar_fixes = await get_similar_successful_fixes(task_data, redis_client)
-            similar_fixes_text = format_similar_fixes(similar_fixes)
-            if similar_fixes:
-                logger.info("Found %d similar successful fixes to learn from", len(similar_fixes))
-
-            # Get style rules learned from past reviews
-            product = task_data.get("product", "")
-            style_rules = []
-            style_rules_text = ""
-            if product:
-                style_rules = await get_top_rules_for_product(redis_client, product, limit=10)
-                style_rules_text = format_rules_for_prompt(style_rules)
-                if style_rules:
-                    logger.info("Found %d style rules for product %s", len(style_rules), product)
-                    # Increment usage counters for each rule
-                    for rule in style_rules:
-                        await increment_rule_usage(redis_client, product, rule.get("id", ""))
-
             # Run the fix agent with similar fixes and style rules context
             logger.info("Running fix agent for task %s", task_id)
             fix_result = await run_fix_agent(
@@ -656,11 +651,11 @@ async def fix_task(task_id: str) -> dict:
                     detail=f"Fix agent failed: {fix_result.error or fix_result.message}",
                 )
 
-            # Commit and push (run in thread pool to avoid blocking)
+            # Commit and push
             title = task_data.get("title", "Fix issue")
             commit_message = f"fix: {title}\n\nAutomated fix by Darwin for task {task_id}"
 
-            push_success = await asyncio.to_thread(commit_and_push, repo_path, commit_message, branch_name)
+            push_success = await commit_and_push_async(repo_path, commit_message, branch_name)
             if not push_success:
                 await update_task_fix(redis_client, task_id, "failed")
                 raise HTTPException(status_code=500, detail="Failed to push changes")
@@ -728,7 +723,9 @@ This pull request was automatically generated by Darwin.
             }
 
         finally:
-            # Cleanup temp directory (run in thread pool to avoid blocking)
+            # Close the agent session bound to the clone, then delete it
+            # (in the thread pool to avoid blocking)
+            await release_agent_sessions(repo_path)
             await asyncio.to_thread(cleanup_repo, repo_path)
 
     except HTTPException:
@@ -37,6 +37,31 @@ async def create_redis_client() -> redis.Redis:
     return client
 
 
+def create_pooled_client(client: redis.Redis, max_connections: int) -> redis.Redis:
+    """Create a client for the same server as client, with its own pool.
+
+    Lets a workload (e.g. a worker's blocking queue pops) use connections
+    that can't be starved by, or starve, the rest of the app.
+
+    Args:
+        client: Client whose server and connection settings to reuse.
+        max_connections: Size of the new connection pool.
+
+    Returns:
+        A Redis client backed by a dedicated connection pool, which its
+        aclose() disconnects.
+    """
+    source_pool = client.connection_pool
+    # Blocking pool: callers wait for a free connection instead of erroring
+    pool = redis.BlockingConnectionPool(
+        connection_class=source_pool.connection_class,
+        max_connections=max_connections,
+        **source_pool.connection_kwargs,
+    )
+    # from_pool hands ownership of the pool to the client
+    return redis.Redis.from_pool(pool)
+
+
 async def get_redis() -> redis.Redis:
     """Get the global Redis client.
 
@@ -1,5 +1,6 @@
 """Task storage in Redis."""
 
+import heapq
 import logging
 import time
 import uuid
@@ -155,10 +156,8 @@ async def list_tasks(
 
             tasks.append(data)
 
-    # Sort by created_at descending
-    tasks.sort(key=lambda x: x.get("created_at") or 0, reverse=True)
-
-    return tasks[:limit]
+    # Newest first; nlargest avoids sorting every task to keep `limit`
+    return heapq.nlargest(limit, tasks, key=lambda x: x.get("created_at") or 0)
 
 
 async def update_task_status(
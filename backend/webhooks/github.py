@@ -9,10 +9,10 @@ import re
 
 from redis.asyncio import Redis
 
-from agent import run_feedback_fix_agent, clone_repo, commit_and_push, cleanup_repo
+from agent import run_feedback_fix_agent, release_agent_sessions, clone_repo_async, commit_and_push_async, cleanup_repo
 from config import get_repo_for_product
 from github import GitHubClient
-from learning.rules import create_rule
+from learning.rules import create_rules
 from learning.rule_extractor import extract_rules_from_feedback
 from tasks import get_task
 
@@ -249,19 +249,16 @@ async def _extract_and_store_rules(
             logger.debug("No rules extracted from feedback for task %s", task_id)
             return 0
         
-        # Store each rule
-        created_count = 0
-        for rule in rules:
-            await create_rule(
-                redis_client=redis_client,
-                product=product,
-                content=rule["content"],
-                category=rule["category"],
-                source="review_feedback",
-                source_task_id=task_id,
-                reviewer=reviewer,
-            )
-            created_count += 1
+        # Store all rules in one pipeline
+        rule_ids = await create_rules(
+            redis_client=redis_client,
+            product=product,
+            rules=rules,
+            source="review_feedback",
+            source_task_id=task_id,
+            reviewer=reviewer,
+        )
+        created_count = len(rule_ids)
         
         logger.info("Created %d rules from review feedback for product %s", 
                    created_count, product)
@@ -352,10 +349,11 @@ async def _trigger_feedback_fix(
     
     try:
         # Initialize GitHub client and fetch comments
-        github_client = GitHubClient()
-        
-        reviews = await github_client.get_pr_reviews(repo, pr_number)
-        inline_comments = await github_client.get_pr_comments(repo, pr_number)
+        async with GitHubClient() as github_client:
+            reviews, inline_comments = await asyncio.gather(
+                github_client.get_pr_reviews(repo, pr_number),
+                github_client.get_pr_comments(repo, pr_number),
+            )
         
         # Convert to dicts for the agent
         reviews_data = [
@@ -378,8 +376,8 @@ async def _trigger_feedback_fix(
             len(reviews_data), len(inline_data), task_id
         )
         
-        # Clone the repo and checkout the PR branch (run in thread pool to avoid blocking)
-        clone_result = await asyncio.to_thread(clone_repo, repo, branch=pr_branch, task_id=f"{task_id}-feedback")
+        # Clone the repo and checkout the PR branch
+        clone_result = await clone_repo_async(repo, branch=pr_branch, task_id=f"{task_id}-feedback")
         
         if not clone_result.success:
             logger.error("Failed to clone repo: %s", clone_result.error)
@@ -405,10 +403,10 @@ async def _trigger_feedback_fix(
                 await redis_client.hset(task_key, "fix_status", "failed")
                 return False
             
-            # Commit and push the changes (run in thread pool to avoid blocking)
+            # Commit and push the changes
             commit_message = f"fix: address review feedback (iteration {iteration_count + 1})\n\nAutomated fix by Darwin for task {task_id}"
             
-            push_success = await asyncio.to_thread(commit_and_push, repo_path, commit_message, pr_branch)
+            push_success = await commit_and_push_async(repo_path, commit_message, pr_branch)
             if not push_success:
                 logger.error("Failed to push feedback fixes for task %s", task_id)
                 await redis_client.hset(task_key, "fix_status", "failed")
@@ -423,7 +421,9 @@ async def _trigger_feedback_fix(
             return True
             
         finally:
-            # Clean up the cloned repo (run in thread pool to avoid blocking)
+            # Close the agent session bound to the clone, then clean it up
+            # (in the thread pool to avoid blocking)
+            await release_agent_sessions(repo_path)
             await asyncio.to_thread(cleanup_repo, repo_path)
             
     except Exception as e:
@@ -494,7 +494,7 @@ async def store_successful_fix(
         
         embedder = get_embedder()
         text = f"{fix_record['category']}: {fix_record['title']}. {fix_record['summary']}"
-        embedding = await embedder.embed(text)
+        embedding = await embedder.embed_np(text)
         
         # Store embedding in both formats:
         # - embedding: raw bytes for RediSearch vector index
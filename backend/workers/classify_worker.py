@@ -6,18 +6,21 @@ import os
 
 import redis.asyncio as redis
 
-from agent import run_fix_agent, clone_repo, create_branch, commit_and_push, create_pr
+from agent import (
+    run_fix_agent,
+    prewarm_fix_agent,
+    release_agent_sessions,
+    clone_repo_async,
+    create_branch,
+    commit_and_push_async,
+    create_pr,
+    cleanup_repo,
+)
 from classify import TopicClassifier
 from config import get_repo_for_product
 from github import GitHubClient, format_issue_body, format_issue_title, get_labels_for_task
 from ingest.cluster import get_topic, TOPIC_PREFIX
-from learning import (
-    get_top_rules_for_product,
-    format_rules_for_prompt,
-    increment_rule_usage,
-    get_similar_successful_fixes,
-    format_similar_fixes,
-)
+from learning import get_fix_context
 from llm import get_llm
 from tasks.storage import (
     create_task,
@@ -249,9 +252,12 @@ class ClassifyWorker:
             # Update status to running
             await update_task_fix(self.redis, task_id, "running")
 
-            # Clone repository (run in thread pool to avoid blocking)
+            # Clone repository while fetching learned context (independent I/O)
             logger.info("Auto-fix: Cloning repo %s for task %s", repo, task_id)
-            clone_result = await asyncio.to_thread(clone_repo, repo, task_id=task_id)
+            clone_result, (similar_fixes_text, style_rules_text) = await asyncio.gather(
+                clone_repo_async(repo, task_id=task_id),
+                get_fix_context(self.redis, task_data, product),
+            )
 
             if not clone_result.success:
                 await update_task_fix(self.redis, task_id, "failed")
@@ -261,68 +267,55 @@ class ClassifyWorker:
             repo_path = clone_result.path
             branch_name = f"darwin/fix-{task_id}"
 
-            # Create fix branch (run in thread pool to avoid blocking)
-            branch_created = await asyncio.to_thread(create_branch, repo_path, branch_name)
-            if not branch_created:
-                await update_task_fix(self.redis, task_id, "failed")
-                logger.error("Auto-fix: Failed to create branch")
-                return
-
-            # Get similar successful fixes for self-improvement
-            similar_fixes = await get_similar_successful_fixes(task_data, self.redis)
-            similar_fixes_text = format_similar_fixes(similar_fixes)
-            if similar_fixes:
-                logger.info("Auto-fix: Found %d similar successful fixes", len(similar_fixes))
-
-            # Get style rules learned from past reviews
-            style_rules = []
-            style_rules_text = ""
-            if product:
-                style_rules = await get_top_rules_for_product(self.redis, product, limit=10)
-                style_rules_text = format_rules_for_prompt(style_rules)
-                if style_rules:
-                    logger.info("Auto-fix: Found %d style rules for product %s", len(style_rules), product)
-                    for rule in style_rules:
-                        await increment_rule_usage(self.redis, product, rule.get("id", ""))
-
-            # Run the fix agent
-            logger.info("Auto-fix: Running fix agent for task %s", task_id)
-            fix_result = await run_fix_agent(
-                repo_path,
-                task_data,
-                similar_fixes_text,
-                style_rules_text,
-            )
-
-            if not fix_result.success:
-                await update_task_fix(self.redis, task_id, "failed")
-                logger.error("Auto-fix: Fix agent failed: %s", fix_result.error or fix_result.message)
-                return
-
-            # Commit and push (run in thread pool to avoid blocking)
-            title = task_data.get("title", "Fix issue")
-            commit_message = f"fix: {title}\n\nAutomated fix by Darwin for task {task_id}"
-
-            push_success = await asyncio.to_thread(commit_and_push, repo_path, commit_message, branch_name)
-            if not push_success:
-                await update_task_fix(self.redis, task_id, "failed")
-                logger.error("Auto-fix: Failed to push changes")
-                return
-
-            # Create PR
-            pr_title = f"[Darwin] {title}"
+            try:
+                # Create fix branch (in a worker thread) while the agent session starts
+                branch_created, _ = await asyncio.gather(
+                    asyncio.to_thread(create_branch, repo_path, branch_name),
+                    prewarm_fix_agent(repo_path),
+                )
+                if not branch_created:
+                    await update_task_fix(self.redis, task_id, "failed")
+                    logger.error("Auto-fix: Failed to create branch")
+                    return
+
+                # Run the fix agent
+                logger.info("Auto-fix: Running fix agent for task %s", task_id)
+                fix_result = await run_fix_agent(
+                    repo_path,
+                    task_data,
+                    similar_fixes_text,
+                    style_rules_text,
+                )
 
-            # Build issue reference if available
-            issue_number = task_data.get('github_issue_number')
-            issue_url = task_data.get('github_issue_url')
-            if issue_number:
-                issue_ref = f"Fixes #{issue_number}"
-                issue_link = f"- **Related Issue**: [{issue_ref}]({issue_url})"
-            else:
-                issue_ref = ""
-                issue_link = ""
+                if not fix_result.success:
+                    await update_task_fix(self.redis, task_id, "failed")
+                    logger.error("Auto-fix: Fix agent failed: %s", fix_result.error or fix_result.message)
+                    return
+
+                # Commit and push
+                title = task_data.get("title", "Fix issue")
+                commit_message = f"fix: {title}\n\nAutomated fix by Darwin for task {task_id}"
+
+                push_success = await commit_and_push_async(repo_path, commit_message, branch_name)
+                if not push_success:
+                    await update_task_fix(self.redis, task_id, "failed")
+                    logger.error("Auto-fix: Failed to push changes")
+                    return
+
+                # Create PR
+                pr_title = f"[Darwin] {title}"
+
+                # Build issue reference if available
+                issue_number = task_data.get('github_issue_number')
+                issue_url = task_data.get('github_issue_url')
+                if issue_number:
+                    issue_ref = f"Fixes #{issue_number}"
+                    issue_link = f"- **Related Issue**: [{issue_ref}]({issue_url})"
+                else:
+                    issue_ref = ""
+                    issue_link = ""
 
-            pr_body = f"""## Automated Fix
+                pr_body = f"""## Automated Fix
 
 This pull request was automatically generated by Darwin.
 {f'{chr(10)}{issue_ref}' if issue_ref else ''}
@@ -340,25 +333,30 @@ This pull request was automatically generated by Darwin.
 *Created by [Darwin](https://github.com/Raptors65/darwin) | Task ID: {task_id}*
 """
 
-            pr_data = await create_pr(repo, branch_name, pr_title, pr_body, base=clone_result.default_branch)
-
-            if pr_data:
-                await update_task_fix(
-                    self.redis, task_id, "completed",
-                    fix_pr_url=pr_data["html_url"],
-                    fix_branch=branch_name,
-                )
-                logger.info(
-                    "Auto-fix: Created PR for task %s: %s",
-                    task_id,
-                    pr_data["html_url"],
-                )
-            else:
-                await update_task_fix(
-                    self.redis, task_id, "completed",
-                    fix_branch=branch_name,
-                )
-                logger.warning("Auto-fix: Changes pushed but PR creation failed for task %s", task_id)
+                pr_data = await create_pr(repo, branch_name, pr_title, pr_body, base=clone_result.default_branch)
+
+                if pr_data:
+                    await update_task_fix(
+                        self.redis, task_id, "completed",
+                        fix_pr_url=pr_data["html_url"],
+                        fix_branch=branch_name,
+                    )
+                    logger.info(
+                        "Auto-fix: Created PR for task %s: %s",
+                        task_id,
+                        pr_data["html_url"],
+                    )
+                else:
+                    await update_task_fix(
+                        self.redis, task_id, "completed",
+                        fix_branch=branch_name,
+                    )
+                    logger.warning("Auto-fix: Changes pushed but PR creation failed for task %s", task_id)
+            finally:
+                # Close the agent session bound to the clone, then delete it
+                # (in the thread pool to avoid blocking)
+                await release_agent_sessions(repo_path)
+                await asyncio.to_thread(cleanup_repo, repo_path)
 
         except Exception as e:
             await update_task_fix(self.redis, task_id, "failed")
@@ -423,4 +421,6 @@ This pull request was automatically generated by Darwin.
             except asyncio.CancelledError:
                 pass
             self._task = None
+        if self._github_client:
+            await self._github_client.aclose()
 
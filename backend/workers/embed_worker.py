@@ -8,14 +8,24 @@ import redis.asyncio as redis
 
 from embedders import get_embedder
 from embedders.base import BaseEmbedder
-from ingest.cluster import cluster_signal
-from ingest.dedupe import get_signal, pop_embed_queue, get_embed_queue_length
+from ingest.cluster import cluster_signals_batch
+from ingest.dedupe import (
+    blocking_pop_embed_queue,
+    get_signals,
+    pop_embed_queue_batch,
+    requeue_embed_queue,
+)
+from redis_setup import create_pooled_client
 
 logger = logging.getLogger(__name__)
 
 # Worker configuration
 POLL_INTERVAL = float(os.getenv("EMBED_WORKER_POLL_INTERVAL", "1.0"))
+# Seconds each blocking pop waits for a signal before re-checking _running
+BLOCK_TIMEOUT = float(os.getenv("EMBED_WORKER_BLOCK_TIMEOUT", "5.0"))
 BATCH_SIZE = int(os.getenv("EMBED_WORKER_BATCH_SIZE", "10"))
+# Connections for queue pops (the blocking pop plus a follow-up batch pop)
+QUEUE_POOL_SIZE = 2
 
 
 class EmbedWorker:
@@ -38,108 +48,158 @@ class EmbedWorker:
         Args:
             redis_client: Redis client instance.
             embedder: Embedder to use. Defaults to configured provider.
+                Not wrapped in CachedEmbedder: queued signals are already
+                unique by text hash, so the cache could never hit.
         """
         self.redis = redis_client
-        self.embedder = embedder or get_embedder(
-            os.getenv("EMBEDDING_PROVIDER", "local")
-        )
+        # Dedicated pools so the blocking pop, signal reads and cluster
+        # writes don't queue behind each other or the API's Redis calls
+        self.redis_queue = create_pooled_client(redis_client, QUEUE_POOL_SIZE)
+        self.redis_read = create_pooled_client(redis_client, 2 * BATCH_SIZE)
+        self.redis_write = create_pooled_client(redis_client, BATCH_SIZE)
+        if embedder is None:
+            embedder = get_embedder(os.getenv("EMBEDDING_PROVIDER", "local"))
+        self.embedder = embedder
         self._running = False
         self._task: asyncio.Task | None = None
 
-    async def process_one(self) -> bool:
-        """Process a single signal from the queue.
+    @staticmethod
+    def _embed_input(signal_hash: str, signal_data: dict | None) -> tuple[str, str | None] | None:
+        """Get the text to embed and the product for a fetched signal.
 
         Returns:
-            True if a signal was processed, False if queue was empty.
+            Tuple of (text, product), or None if the signal can't be embedded.
         """
-        # Pop from queue
-        signal_hash = await pop_embed_queue(self.redis)
-        if not signal_hash:
-            return False
-
-        logger.debug("Processing signal: %s", signal_hash[:16])
-
-        # Get signal data
-        signal_data = await get_signal(self.redis, signal_hash)
         if not signal_data:
             logger.warning("Signal not found in Redis: %s", signal_hash[:16])
-            return True
+            return None
 
         # Get the normalized text for embedding
         text = signal_data.get("normalized", signal_data.get("text", ""))
         if not text:
             logger.warning("Signal has no text: %s", signal_hash[:16])
-            return True
+            return None
 
         # Get product for propagation
         product = signal_data.get("product") or None
+        return text, product
 
-        # Generate embedding
-        try:
-            embedding = await self.embedder.embed(text)
-        except Exception as e:
-            logger.error("Failed to embed signal %s: %s", signal_hash[:16], e)
-            # Could re-queue here for retry
-            return True
+    async def _fetch_batch(self) -> list[tuple[str, dict | None]]:
+        """Wait for queued signals and fetch up to BATCH_SIZE of them.
 
-        # Cluster the signal
-        try:
-            result = await cluster_signal(
-                self.redis,
-                signal_hash,
-                text,
-                embedding,
-                product,
-            )
-            logger.info(
-                "Clustered signal %s: action=%s, topic=%s, similarity=%.3f",
-                signal_hash[:16],
-                result.action,
-                result.topic_id,
-                result.similarity or 0,
-            )
-        except Exception as e:
-            logger.error("Failed to cluster signal %s: %s", signal_hash[:16], e)
-
-        return True
-
-    async def process_batch(self, batch_size: int = BATCH_SIZE) -> int:
-        """Process a batch of signals.
+        Returns:
+            (signal_hash, signal_data) pairs; empty if none arrived within
+            BLOCK_TIMEOUT.
+        """
+        # Block until a signal arrives instead of polling the queue
+        signal_hash = await blocking_pop_embed_queue(self.redis_queue, BLOCK_TIMEOUT)
+        if not signal_hash:
+            return []
+        # Take whatever else is already queued into the same batch
+        signal_hashes = [signal_hash]
+        if BATCH_SIZE > 1:
+            signal_hashes += await pop_embed_queue_batch(self.redis_queue, BATCH_SIZE - 1)
+        signals = await get_signals(self.redis_read, signal_hashes)
+        return list(zip(signal_hashes, signals))
+
+    async def _process_signals(self, signals: list[tuple[str, dict | None]]) -> int:
+        """Embed and cluster fetched signals.
+
+        All texts are embedded in a single embed_batch call, then clustered
+        with one cluster_signals_batch call, which still assigns signals in
+        queue order so each sees the topics created by the ones before it.
 
         Args:
-            batch_size: Maximum signals to process in this batch.
+            signals: (signal_hash, signal_data) pairs popped from the queue.
 
         Returns:
             Number of signals processed.
         """
-        processed = 0
-        for _ in range(batch_size):
-            if await self.process_one():
-                processed += 1
-            else:
-                break
-        return processed
+        batch = []
+        for signal_hash, signal_data in signals:
+            embed_input = self._embed_input(signal_hash, signal_data)
+            if embed_input is not None:
+                batch.append((signal_hash, *embed_input))
+
+        if batch:
+            try:
+                embeddings = await self.embedder.embed_batch_np([text for _, text, _ in batch])
+            except Exception as e:
+                logger.error("Failed to embed batch of %d signals: %s", len(batch), e)
+                # Could re-queue here for retry
+                return len(signals)
+
+            signal_hashes, texts, products = (list(column) for column in zip(*batch))
+            try:
+                results = await cluster_signals_batch(
+                    self.redis_write,
+                    signal_hashes,
+                    texts,
+                    embeddings,
+                    products,
+                )
+            except Exception as e:
+                logger.error("Failed to cluster batch of %d signals: %s", len(batch), e)
+                return len(signals)
+
+            for signal_hash, result in zip(signal_hashes, results):
+                logger.info(
+                    "Clustered signal %s: action=%s, topic=%s, similarity=%.3f",
+                    signal_hash[:16],
+                    result.action,
+                    result.topic_id,
+                    result.similarity or 0,
+                )
+
+        return len(signals)
+
+    async def _requeue_prefetched(self, next_batch: asyncio.Task) -> None:
+        """Put a prefetched but unprocessed batch back at the head of the queue."""
+        try:
+            signals = await next_batch
+        except Exception:
+            return
+        if signals:
+            await requeue_embed_queue(self.redis_queue, [signal_hash for signal_hash, _ in signals])
+            logger.info("Returned %d prefetched signals to the queue", len(signals))
 
     async def run(self) -> None:
-        """Run the worker loop."""
+        """Run the worker loop.
+
+        The next batch is fetched from Redis while the current one is
+        embedded and clustered, so the embedder doesn't wait on Redis
+        between batches.
+
+        Idle workers block in BLPOP rather than polling or subscribing to a
+        notification channel: Redis wakes exactly one worker per queued
+        signal, with no extra publish on the ingest path, and BLOCK_TIMEOUT
+        acts as the watchdog that re-checks _running.
+        """
         self._running = True
         logger.info("Embed worker started")
 
-        while self._running:
-            try:
-                queue_len = await get_embed_queue_length(self.redis)
-                if queue_len > 0:
-                    logger.debug("Queue length: %d", queue_len)
-                    processed = await self.process_batch()
-                    if processed > 0:
+        next_batch: asyncio.Task | None = None
+        try:
+            while self._running:
+                try:
+                    if next_batch is None:
+                        next_batch = asyncio.create_task(self._fetch_batch())
+                    # Shielded so a stop mid-fetch can still return its signals
+                    signals = await asyncio.shield(next_batch)
+                    next_batch = asyncio.create_task(self._fetch_batch())
+                    if signals:
+                        processed = await self._process_signals(signals)
                         logger.info("Processed %d signals", processed)
-                else:
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    logger.exception("Error in embed worker: %s", e)
+                    if next_batch is not None and next_batch.done():
+                        next_batch = None
                     await asyncio.sleep(POLL_INTERVAL)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.exception("Error in embed worker: %s", e)
-                await asyncio.sleep(POLL_INTERVAL)
+        finally:
+            if next_batch is not None:
+                await self._requeue_prefetched(next_batch)
 
         logger.info("Embed worker stopped")
 
@@ -162,3 +222,6 @@ class EmbedWorker:
             except asyncio.CancelledError:
                 pass
             self._task = None
+        self.embedder.close()
+        for client in (self.redis_queue, self.redis_read, self.redis_write):
+            await client.aclose()